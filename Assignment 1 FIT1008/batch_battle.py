@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import numpy as np
+
+from battle import Battle
+from elements import Element, EffectivenessCalculator
+from helpers import get_all_monsters, get_stat_table
+from monster_base import MonsterBase
+from team import MonsterTeam
+from data_structures.referential_array import ArrayR
+
+
+class _BatchSide:
+    """
+    One side (team 1 or team 2) of every battle in a BatchBattle, stored as arrays.
+
+    Each row b is the team container of battle b:
+    * FRONT rows are stacks, slots[b, :length[b]] from bottom to top.
+    * BACK rows are circular queues, served from slots[b, front[b]].
+    * OPTIMISE rows are sorted lists, slots[b, :length[b]] in ascending keys[b].
+    """
+
+    FRONT = 0
+    BACK = 1
+    OPTIMISE = 2
+
+    def __init__(self, n: int, capacity: int) -> None:
+        """
+        Allocate the arrays of the side.
+        Best = Worst = O(n * capacity) to initialise the arrays
+        """
+        self.capacity = capacity
+        self.mode = np.zeros(n, dtype=np.int64)
+        self.sort_stat = np.zeros(n, dtype=np.int64)
+        self.slots = np.zeros((n, capacity), dtype=np.int64)
+        self.keys = np.zeros((n, capacity), dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.front = np.zeros(n, dtype=np.int64)
+        self.out = np.zeros(n, dtype=np.int64)
+
+    def add(self, engine: BatchBattle, b: np.ndarray, m: np.ndarray) -> None:
+        """
+        Vectorised MonsterTeam.add_to_team of monster m[i] to the team of battle b[i].
+        c is the capacity of the side
+
+        Best = Worst = O(len(b) * c), every OPTIMISE row binary searches and shifts its slots
+        """
+        mode = self.mode[b]
+
+        front = mode == self.FRONT
+        fb = b[front]
+        self.slots[fb, self.length[fb]] = m[front]
+
+        back = mode == self.BACK
+        bb = b[back]
+        self.slots[bb, (self.front[bb] + self.length[bb]) % self.capacity] = m[back]
+
+        optimise = mode == self.OPTIMISE
+        if optimise.any():
+            self._add_sorted(engine, b[optimise], m[optimise])
+
+        self.length[b] += 1
+
+    def _add_sorted(self, engine: BatchBattle, b: np.ndarray, m: np.ndarray) -> None:
+        """
+        Insert into the sorted rows exactly where ArraySortedList.add would,
+        including the negated keys left behind by MonsterTeam.special.
+        """
+        key = engine.sort_values(self.sort_stat[b], m)
+        length = self.length[b]
+        negate = (length > 0) & (self.keys[b, 0] < 0)
+        key = np.where(negate, -key, key)
+
+        # replay ArraySortedList._index_to_add so equal keys land in the same slot
+        low = np.zeros(len(b), dtype=np.int64)
+        high = length - 1
+        found = np.full(len(b), -1, dtype=np.int64)
+        searching = low <= high
+        while searching.any():
+            mid = (low + high) // 2
+            mid_key = self.keys[b, np.clip(mid, 0, self.capacity - 1)]
+            lower = searching & (mid_key < key)
+            higher = searching & (mid_key > key)
+            equal = searching & ~lower & ~higher
+            low = np.where(lower, mid + 1, low)
+            high = np.where(higher, mid - 1, high)
+            found = np.where(equal, mid, found)
+            searching = searching & ~equal & (low <= high)
+        position = np.where(found >= 0, found, low)
+
+        for j in range(self.capacity - 1, 0, -1):
+            shift = (j > position) & (j <= length)
+            rows = b[shift]
+            self.slots[rows, j] = self.slots[rows, j - 1]
+            self.keys[rows, j] = self.keys[rows, j - 1]
+        self.slots[b, position] = m
+        self.keys[b, position] = key
+
+    def retrieve(self, b: np.ndarray) -> np.ndarray:
+        """
+        Vectorised MonsterTeam.retrieve_from_team for the teams of battles b.
+        Best = Worst = O(len(b))
+        """
+        self.length[b] -= 1
+        mode = self.mode[b]
+        served = np.where(mode == self.BACK, self.front[b], self.length[b])
+        m = self.slots[b, served]
+        back = b[mode == self.BACK]
+        self.front[back] = (self.front[back] + 1) % self.capacity
+        return m
+
+
+class BatchBattle:
+    """
+    Runs many battles at once with the monsters kept in struct-of-arrays form.
+
+    Every call to step advances all battles which are not finished by one turn,
+    following Battle.process_turn and MonsterTeam.choose_action exactly,
+    so each pair gets the same Battle.Result the scalar Battle would give.
+
+    The teams passed in are only read, never modified.
+
+    Usage:
+    ```
+    results = BatchBattle().battle(teams1, teams2)   # ArrayR[Battle.Result]
+    ```
+    """
+
+    SORT_STATS = (
+        MonsterTeam.SortMode.HP,
+        MonsterTeam.SortMode.ATTACK,
+        MonsterTeam.SortMode.DEFENSE,
+        MonsterTeam.SortMode.SPEED,
+        MonsterTeam.SortMode.LEVEL,
+    )
+
+    def __init__(self) -> None:
+        """
+        Index the monster catalog and the effectiveness chart.
+        The stats come from helpers.get_stat_table(), which is built once per process.
+        c is the number of monster classes and e the number of elements
+
+        Best = Worst = O(c + e^2) once the stat table exists
+        """
+        self.classes = get_all_monsters()
+        self.table = get_stat_table()
+        count = len(self.classes)
+        self._class_ids = {}
+        for i in range(count):
+            self._class_ids[self.classes[i]] = i
+        self.evolution = np.full(count, -1, dtype=np.int64)
+        self.element = np.zeros(count, dtype=np.int64)
+        for i in range(count):
+            monster_class = self.classes[i]
+            evolution = monster_class.get_evolution()
+            if evolution is not None:
+                self.evolution[i] = self.class_id(evolution)
+            self.element[i] = monster_class.get_element_type().value
+
+        elements = len(Element)
+        self.effectiveness = np.zeros((elements + 1, elements + 1), dtype=np.float64)
+        for attacker in Element:
+            for defender in Element:
+                self.effectiveness[attacker.value, defender.value] = \
+                    EffectivenessCalculator.get_effectiveness(attacker, defender)
+
+    def class_id(self, monster_class: type[MonsterBase]) -> int:
+        """
+        Index of a monster class in get_all_monsters().
+        Best = Worst = O(1)
+        """
+        if monster_class in self._class_ids:
+            return self._class_ids[monster_class]
+        raise ValueError(f"{monster_class.__name__} is not in the monster catalog")
+
+    def battle(self, teams1: ArrayR[MonsterTeam], teams2: ArrayR[MonsterTeam]) -> ArrayR[Battle.Result]:
+        """
+        Battle teams1[i] against teams2[i] for every i.
+        n is the number of pairs, k the length of the longest battle and t the team limit
+
+        Best = Worst = O(n * t + k * n * t) vectorised operations
+        """
+        self.load(teams1, teams2)
+        while self.step() > 0:
+            pass
+        return self.results()
+
+    def load(self, teams1: ArrayR[MonsterTeam], teams2: ArrayR[MonsterTeam]) -> None:
+        """
+        Copy the state of every pair of teams into arrays and send out the first monsters,
+        like Battle.battle does before its first turn.
+        m is the number of monsters over all teams
+
+        Best = Worst = O(m)
+        """
+        if len(teams1) != len(teams2):
+            raise ValueError("Both sides need the same number of teams")
+        n = len(teams1)
+        capacity = MonsterTeam.TEAM_LIMIT
+        for i in range(n):
+            capacity = max(capacity, len(teams1[i].arr), len(teams2[i].arr))
+
+        monsters = []
+        self.side1 = _BatchSide(n, capacity)
+        self.side2 = _BatchSide(n, capacity)
+        for i in range(n):
+            self._load_team(self.side1, i, teams1[i], monsters)
+            self._load_team(self.side2, i, teams2[i], monsters)
+
+        self.cls = np.array([self.class_id(type(m)) for m in monsters], dtype=np.int64)
+        self.level = np.array([m.get_level() for m in monsters], dtype=np.int64)
+        self.original_level = np.array([m.original_level for m in monsters], dtype=np.int64)
+        self.hp = np.array([m.get_hp() for m in monsters], dtype=np.int64)
+        self.simple = np.array([m.simple_mode for m in monsters], dtype=bool)
+        self.stats = np.zeros((len(monsters), 4), dtype=np.int64)
+        self._refresh_stats(np.arange(len(monsters)))
+
+        self.result = np.zeros(n, dtype=np.int64)
+        self.turns = np.zeros(n, dtype=np.int64)
+        everyone = np.arange(n)
+        for side in (self.side1, self.side2):
+            if (side.length == 0).any():
+                raise ValueError("Every team needs at least one monster")
+            side.out[:] = side.retrieve(everyone)
+
+    def _load_team(self, side: _BatchSide, i: int, team: MonsterTeam, monsters: list) -> None:
+        """Copy one team container into row i of a side, in container order."""
+        if type(team).choose_action is not MonsterTeam.choose_action:
+            raise ValueError("BatchBattle only models the default MonsterTeam.choose_action")
+        arr = team.arr
+        if team.team_mode == MonsterTeam.TeamMode.FRONT:
+            side.mode[i] = _BatchSide.FRONT
+            members = [arr.array[j] for j in range(len(arr))]
+        elif team.team_mode == MonsterTeam.TeamMode.BACK:
+            side.mode[i] = _BatchSide.BACK
+            members = [arr.array[(arr.front + j) % len(arr.array)] for j in range(len(arr))]
+        else:
+            side.mode[i] = _BatchSide.OPTIMISE
+            if team.sort_mode is None:
+                raise ValueError("TeamMode.OPTIMISE needs a sort key")
+            for stat in range(len(self.SORT_STATS)):
+                if self.SORT_STATS[stat] == team.sort_mode:
+                    side.sort_stat[i] = stat
+            members = [arr.array[j].value for j in range(len(arr))]
+            for j in range(len(arr)):
+                side.keys[i, j] = arr.array[j].key
+        for j in range(len(members)):
+            side.slots[i, j] = len(monsters)
+            monsters.append(members[j])
+        side.length[i] = len(members)
+
+    def _refresh_stats(self, m: np.ndarray) -> None:
+        """
+        Recompute attack, defense, speed and max hp of monsters m after a class or level change,
+        gathering them from the StatTable of the catalog.
+        """
+        simple = self.simple[m]
+        for mode in (True, False):
+            changed = m[simple == mode]
+            self.stats[changed] = self.table.gather(self.cls[changed], self.level[changed], simple_mode=mode)
+
+    def sort_values(self, sort_stat: np.ndarray, m: np.ndarray) -> np.ndarray:
+        """The MonsterTeam.SortMode key of each monster m[i], sort_stat[i] indexing SORT_STATS."""
+        values = np.stack((
+            self.hp[m], self.stats[m, 0], self.stats[m, 1], self.stats[m, 2], self.level[m],
+        ))
+        return values[sort_stat, np.arange(len(m))]
+
+    def _attack(self, attacker: np.ndarray, defender: np.ndarray) -> None:
+        """Vectorised MonsterBase.attack, attacker[i] hitting defender[i]."""
+        attack = self.stats[attacker, 0].astype(np.float64)
+        defense = self.stats[defender, 1].astype(np.float64)
+        dmg = np.where(
+            defense < attack / 2,
+            attack - defense,
+            np.where(defense < attack, attack * 5 / 8 - defense / 4, attack / 4),
+        )
+        effectiveness = self.effectiveness[self.element[self.cls[attacker]], self.element[self.cls[defender]]]
+        self.hp[defender] -= np.ceil(dmg * effectiveness).astype(np.int64)
+
+    def _level_up(self, m: np.ndarray) -> None:
+        """Vectorised MonsterBase.level_up, keeping the missing hp the same."""
+        difference = self.stats[m, 3] - self.hp[m]
+        self.level[m] += 1
+        self._refresh_stats(m)
+        self.hp[m] = self.stats[m, 3] - difference
+
+    def _evolve(self, m: np.ndarray) -> None:
+        """
+        Vectorised MonsterBase.evolve for the monsters ready to evolve.
+        The old monster is replaced in place, as the out monster is not referenced anywhere else.
+        """
+        ready = m[(self.level[m] != self.original_level[m]) & (self.evolution[self.cls[m]] >= 0)]
+        difference = self.stats[ready, 3] - self.hp[ready]
+        self.cls[ready] = self.evolution[self.cls[ready]]
+        self.original_level[ready] = self.level[ready]
+        self._refresh_stats(ready)
+        self.hp[ready] = self.stats[ready, 3] - difference
+
+    def step(self) -> int:
+        """
+        Process one turn of every battle still in progress and return how many are left.
+        n is the number of battles in progress and t the team limit
+
+        Best = Worst = O(n * t) vectorised operations
+        """
+        b = np.flatnonzero(self.result == 0)
+        if len(b) == 0:
+            return 0
+        side1, side2 = self.side1, self.side2
+        self.turns[b] += 1
+
+        # MonsterTeam.choose_action for both teams
+        out1, out2 = side1.out[b], side2.out[b]
+        speed1, speed2 = self.stats[out1, 2], self.stats[out2, 2]
+        hp1, hp2 = self.hp[out1], self.hp[out2]
+        attack1 = (speed1 >= speed2) | (hp1 >= hp2)
+        attack2 = (speed2 >= speed1) | (hp2 >= hp1)
+
+        # swap the out monster with the one retrieved from the team
+        for side, swapping in ((side1, b[~attack1]), (side2, b[~attack2])):
+            if len(swapping):
+                side.add(self, swapping, side.out[swapping])
+                side.out[swapping] = side.retrieve(swapping)
+
+        out1, out2 = side1.out[b], side2.out[b]
+        both = attack1 & attack2
+        speed1, speed2 = self.stats[out1, 2], self.stats[out2, 2]
+        first1 = both & (speed1 > speed2)
+        first2 = both & (speed2 > speed1)
+        tied = both & (speed1 == speed2)
+
+        hits = first1 | tied | (attack1 & ~attack2)
+        self._attack(out1[hits], out2[hits])
+        hits = first2 | (attack2 & ~attack1)
+        self._attack(out2[hits], out1[hits])
+        hits = (first1 & (self.hp[out2] > 0)) | tied
+        self._attack(out2[hits], out1[hits])
+        hits = first2 & (self.hp[out1] > 0)
+        self._attack(out1[hits], out2[hits])
+
+        # both still standing, both lose one hp
+        alive = (self.hp[out1] > 0) & (self.hp[out2] > 0)
+        self.hp[out1[alive]] -= 1
+        self.hp[out2[alive]] -= 1
+
+        alive1, alive2 = self.hp[out1] > 0, self.hp[out2] > 0
+        for winner, loser, won in ((side1, side2, alive1 & ~alive2), (side2, side1, alive2 & ~alive1)):
+            rows = b[won]
+            self._level_up(winner.out[rows])
+            self._evolve(winner.out[rows])
+            rows = rows[loser.length[rows] > 0]
+            loser.out[rows] = loser.retrieve(rows)
+        fainted = b[~alive1 & ~alive2]
+        for side in (side1, side2):
+            rows = fainted[side.length[fainted] > 0]
+            side.out[rows] = side.retrieve(rows)
+
+        lost1 = (side1.length[b] == 0) & (self.hp[side1.out[b]] <= 0)
+        lost2 = (side2.length[b] == 0) & (self.hp[side2.out[b]] <= 0)
+        self.result[b] = np.select(
+            (lost1 & lost2, lost1, lost2),
+            (Battle.Result.DRAW.value, Battle.Result.TEAM2.value, Battle.Result.TEAM1.value),
+            0,
+        )
+        return int(np.count_nonzero(self.result == 0))
+
+    def results(self) -> ArrayR[Battle.Result]:
+        """
+        The Battle.Result of every battle, None for battles still in progress.
+        Best = Worst = O(n) where n is the number of battles
+        """
+        results = ArrayR(len(self.result))
+        for i in range(len(self.result)):
+            for result in Battle.Result:
+                if result.value == self.result[i]:
+                    results[i] = result
+        return results
@@ -3,8 +3,12 @@ from enum import auto
 from typing import Optional
 
 from base_enum import BaseEnum
+from monster_base import MonsterBase
+from random_gen import RandomGen
 from team import MonsterTeam
 from data_structures.queue_adt import CircularQueue
+import battle_log
+import profiling
 
 
 class Battle:
@@ -19,12 +23,63 @@ class Battle:
         TEAM2 = auto()
         DRAW = auto()
 
-    def __init__(self, verbosity=0) -> None:
+    class Snapshot:
+        """
+        The state of a battle in flight, see Battle.snapshot.
+        Monsters and team containers are kept as tuples of plain values, so a snapshot
+        takes a few hundred bytes and later turns cannot change them.
+        team1 and team2 are references to the live teams, not copies: restore writes the
+        saved states back into those same team objects.
+        """
+        __slots__ = ("team1", "team2", "team1_state", "team2_state", "out1", "out2", "turn_number", "seed")
+
+        def __init__(self, team1, team2, team1_state, team2_state, out1, out2, turn_number, seed) -> None:
+            self.team1 = team1
+            self.team2 = team2
+            self.team1_state = team1_state
+            self.team2_state = team2_state
+            self.out1 = out1
+            self.out2 = out2
+            self.turn_number = turn_number
+            self.seed = seed
+
+    # far more turns than the monsters of two full teams have hp to last,
+    # for callers which opt in to a cap (simulations and the battle service)
+    DEFAULT_MAX_TURNS = 10000
+
+    def __init__(
+        self,
+        verbosity=0,
+        log: Optional[battle_log.BattleLogWriter] = None,
+        profiler: Optional[profiling.PhaseProfiler] = None,
+        max_turns: Optional[int] = None,
+        detect_cycles: bool = False,
+        stalled_result: Battle.Result = Result.DRAW,
+    ) -> None:
         """
         Initialise a battle instance.
+        If a log is given, every turn is written to it as a battle_log record.
+        If a profiler is given, or one is enabled with profiling.enable, every phase of a turn is timed.
+
+        Two guards end battles which would never finish, with stalled_result as the result:
+        * max_turns caps the number of turns of a battle. The default, None, is no cap as battles
+          always had; pass DEFAULT_MAX_TURNS to opt in,
+        * detect_cycles hashes the state after every turn (see state_key) and stops when one repeats.
+        Battles never draw random numbers, so a repeated state means the battle would loop forever.
+        turn_caps and cycles_detected count how often each guard fired over the battles of this instance.
+
         Best = Worst = O(1), as there are only assignments and arithmetic operations which are constant time
         """
+        if max_turns is not None and max_turns < 1:
+            raise ValueError("max_turns should be at least 1")
         self.verbosity = verbosity
+        self.log = log
+        self.profiler = profiler if profiler is not None else profiling.active_profiler()
+        self.max_turns = max_turns
+        self.detect_cycles = detect_cycles
+        self.stalled_result = stalled_result
+        self.turn_caps = 0
+        self.cycles_detected = 0
 
     def process_turn(self) -> Optional[Battle.Result]:
         """
@@ -43,10 +98,15 @@ class Battle:
         Both best case scenario is provided where none of the monsters die and thus no retrieving of monsters are performed
         And the best case scenario is taking the worst case of attack which is O(e^2)
         """
-        
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start()
+
         # Process the actions chosen by each team
         action1 = self.team1.choose_action(self.out1, self.out2)
         action2 = self.team2.choose_action(self.out2, self.out1)
+        if profiler is not None:
+            profiler.lap(profiling.PhaseProfiler.CHOOSE)
 
         # Handle SWAP and SPECIAL actions
         if action1 in (Battle.Action.SWAP, Battle.Action.SPECIAL):
@@ -76,7 +136,18 @@ class Battle:
                 self.team2.special()
                 new_monster = self.team2.retrieve_from_team()
                 self.out2 = new_monster
+        if profiler is not None:
+            profiler.lap(profiling.PhaseProfiler.SWAP)
 
+        # keep what the turn starts with, to work out the log record at the end
+        if self.log is not None:
+            fighter1, fighter2 = self.out1, self.out2
+            hp1, hp2 = fighter1.get_hp(), fighter2.get_hp()
+            level1, level2 = fighter1.get_level(), fighter2.get_level()
+            speed1, speed2 = fighter1.get_speed(), fighter2.get_speed()
+            # the log bookkeeping in the middle of the turn is not timed as the attack
+            if profiler is not None:
+                profiler.start()
 
         # Attack logic in the case of both monsters attacking
         if action1 == Battle.Action.ATTACK and action2 == Battle.Action.ATTACK:
@@ -102,11 +173,21 @@ class Battle:
             self.out1.attack(self.out2)
         elif action2 == Battle.Action.ATTACK:
             self.out2.attack(self.out1)
-        
+        if profiler is not None:
+            profiler.lap(profiling.PhaseProfiler.ATTACK)
+
+        if self.log is not None:
+            damage1 = hp2 - fighter2.get_hp()
+            damage2 = hp1 - fighter1.get_hp()
+            if profiler is not None:
+                profiler.start()
+
         # if both alive then minus one hp for both monsters
         if self.out1.get_hp() > 0 and self.out2.get_hp() > 0:
             self.out1.set_hp(self.out1.get_hp() -1)
             self.out2.set_hp(self.out2.get_hp() -1)
+        if profiler is not None:
+            profiler.lap(profiling.PhaseProfiler.CHIP)
 
         # if either one of the monsters die
         # In this case if monster 2 die
@@ -115,6 +196,8 @@ class Battle:
             self.out1.level_up()
             if self.out1.ready_to_evolve():
                 self.out1 = self.out1.evolve()
+            if profiler is not None:
+                profiler.lap(profiling.PhaseProfiler.LEVEL)
             # if there are still monsters in team 2, retrieve a new monster
             if len(self.team2) > 0:
                 self.out2 = self.team2.retrieve_from_team()
@@ -123,31 +206,67 @@ class Battle:
             self.out2.level_up()
             if self.out2.ready_to_evolve():
                 self.out2 = self.out2.evolve() 
+            if profiler is not None:
+                profiler.lap(profiling.PhaseProfiler.LEVEL)
             if len(self.team1) > 0:
                 self.out1 = self.team1.retrieve_from_team()
         
         # if both monsters die
         elif self.out2.get_hp() <= 0 and self.out1.get_hp() <= 0:
+            # nobody levels up, the LEVEL lap is still taken so every phase is counted once per turn
+            if profiler is not None:
+                profiler.lap(profiling.PhaseProfiler.LEVEL)
             # a new monster is retrieved from both teams if there are still monsters in the team
             if len(self.team1) > 0:
                 self.out1 = self.team1.retrieve_from_team()
             if len(self.team2) > 0:
                 self.out2 = self.team2.retrieve_from_team()
+        elif profiler is not None:
+            profiler.lap(profiling.PhaseProfiler.LEVEL)
+        if profiler is not None:
+            profiler.lap(profiling.PhaseProfiler.RETRIEVE)
 
         # Check if there are any monsters left in either team
         # Also check if the out monsters are dead
         # return the respective output
+        result = None
         if len(self.team1) == 0 and self.out1.get_hp() <= 0 and len(self.team2) == 0 and self.out2.get_hp() <= 0:
-            return Battle.Result.DRAW
+            result = Battle.Result.DRAW
         # Check if there any monsters left in team 1 and if the out monster is dead
         elif len(self.team1) == 0 and self.out1.get_hp() <= 0:
-            return Battle.Result.TEAM2
+            result = Battle.Result.TEAM2
         # Check if there any monsters left in team 2 and if the out monster is dead
         elif len(self.team2) == 0 and self.out2.get_hp() <= 0:
-            return Battle.Result.TEAM1
+            result = Battle.Result.TEAM1
+        if profiler is not None:
+            profiler.lap(profiling.PhaseProfiler.RESULT)
+
+        if self.log is not None:
+            # the team whose monster attacked first, out1 goes first on a speed tie
+            first_attacker = 0
+            if action1 == Battle.Action.ATTACK and (action2 != Battle.Action.ATTACK or speed1 >= speed2):
+                first_attacker = 1
+            elif action2 == Battle.Action.ATTACK:
+                first_attacker = 2
+            # a fighter which is no longer out either evolved (it won) or fainted and was replaced
+            flags = 0
+            if fighter1.get_level() != level1:
+                flags |= battle_log.LEVEL_UP1
+            if fighter2.get_level() != level2:
+                flags |= battle_log.LEVEL_UP2
+            if self.out1 is not fighter1:
+                flags |= battle_log.EVOLVE1 if fighter1.get_hp() > 0 else battle_log.RETRIEVE1
+            if self.out2 is not fighter2:
+                flags |= battle_log.EVOLVE2 if fighter2.get_hp() > 0 else battle_log.RETRIEVE2
+            self.log.write_turn(
+                self.battle_id, self.turn_number, action1.value, action2.value, first_attacker, flags,
+                0 if result is None else result.value, damage1, damage2, fighter1.get_hp(), fighter2.get_hp(),
+            )
+            if profiler is not None:
+                profiler.lap(profiling.PhaseProfiler.LOG)
 
         #return none if the battle is not completed
-        return None
+        return result
         
 
     def battle(self, team1: MonsterTeam, team2: MonsterTeam) -> Battle.Result:
@@ -171,12 +290,92 @@ class Battle:
         self.team2 = team2
         self.out1 = team1.retrieve_from_team()
         self.out2 = team2.retrieve_from_team()
+        if self.log is not None:
+            self.battle_id = self.log.start_battle()
+        result = self.resume()
+        # Add any postgame logic here.
+        return result
+
+    def resume(self, snapshot: Optional[Battle.Snapshot] = None) -> Battle.Result:
+        """
+        Process turns until the battle is over, first restoring snapshot if one is given.
+        As the battle only depends on its state, resuming the same snapshot always gives the same result.
+        The battle also ends, with stalled_result, once it reaches max_turns or repeats a state.
+        With a log, the turns played from a snapshot are logged as a new battle of the log, whose
+        records carry on from the turn number of the snapshot.
+        k is how many turns are left, e the elements and n the team size
+
+        Best = O(e^2) when the battle ends on the next turn, Worst = O(k * (e^2 + n))
+        (detect_cycles adds O(n) per turn to hash the state)
+        """
+        if snapshot is not None:
+            self.restore(snapshot)
+            if self.log is not None:
+                self.battle_id = self.log.start_battle()
+        seen = set() if self.detect_cycles else None
         result = None
         while result is None:
+            if self.max_turns is not None and self.turn_number >= self.max_turns:
+                self.turn_caps += 1
+                return self._stall()
+            self.turn_number += 1
             result = self.process_turn()
-        # Add any postgame logic here.
+            if result is None and seen is not None:
+                state = self.state_key()
+                if state in seen:
+                    self.cycles_detected += 1
+                    return self._stall()
+                seen.add(state)
         return result
 
+    def _stall(self) -> Battle.Result:
+        """
+        End a battle stopped by max_turns or detect_cycles with stalled_result.
+        If there is a log, the end is written as one more record with no actions, the result and
+        the battle_log.STALLED flag, so every logged battle ends with a result.
+        Best = Worst = O(1)
+        """
+        if self.log is not None:
+            self.log.write_turn(
+                self.battle_id, self.turn_number + 1, 0, 0, 0, battle_log.STALLED,
+                self.stalled_result.value, 0, 0, self.out1.get_hp(), self.out2.get_hp(),
+            )
+        return self.stalled_result
+
+    def state_key(self) -> tuple:
+        """
+        A hashable summary of everything the next turns depend on: both out monsters
+        (class, level, hp...) and the order and keys of the monsters left in both teams.
+        Best = Worst = O(n) where n is the team size
+        """
+        return (self.out1.get_state(), self.out2.get_state(), self.team1.state_key(), self.team2.state_key())
+
+    def snapshot(self) -> Battle.Snapshot:
+        """
+        Copy the state of the battle between two turns: both out monsters, both teams
+        (including the original teams used to regenerate them), the turn number and the RandomGen seed.
+        Best = Worst = O(n) where n is the team size
+        """
+        return Battle.Snapshot(
+            self.team1, self.team2, self.team1.snapshot(), self.team2.snapshot(),
+            self.out1.get_state(), self.out2.get_state(), self.turn_number, RandomGen.seed,
+        )
+
+    def restore(self, snapshot: Battle.Snapshot) -> None:
+        """
+        Put the battle back in the state of a snapshot, so it can be continued (see resume).
+        The same snapshot can be restored any number of times to branch from it.
+        Best = Worst = O(n) where n is the team size
+        """
+        self.team1 = snapshot.team1
+        self.team2 = snapshot.team2
+        self.team1.restore(snapshot.team1_state)
+        self.team2.restore(snapshot.team2_state)
+        self.out1 = MonsterBase.from_state(snapshot.out1)
+        self.out2 = MonsterBase.from_state(snapshot.out2)
+        self.turn_number = snapshot.turn_number
+        RandomGen.set_seed(snapshot.seed)
+
 if __name__ == "__main__":
     t1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
     t2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
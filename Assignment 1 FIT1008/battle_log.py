@@ -0,0 +1,198 @@
+"""
+Compact binary log of battle turns.
+
+Every turn is one fixed-width little-endian record (see RECORD), so record k of a log
+starts at byte k * RECORD.size. A small sidecar index, written next to the log as
+<path>.idx, holds the first record and the number of turns of every battle,
+so any battle or turn can be read back with a single seek.
+A battle resumed from a Battle.Snapshot is logged as a battle of its own: its first
+record is turn 1 for the index, and BattleRecord.turn keeps the turn numbers of the battle.
+
+Usage:
+```
+with BattleLogWriter("battles.log") as log:
+    Battle(log=log).battle(team1, team2)
+
+for record in read_records("battles.log"):
+    print(record.battle, record.turn, record.damage1, record.damage2)
+
+index = BattleLogIndex("battles.log")
+index.read_turn(battle=10, turn=3)
+```
+"""
+from __future__ import annotations
+import os
+import struct
+from array import array
+from collections import namedtuple
+from typing import BinaryIO, Iterator
+
+# battle, turn, action1, action2, first attacker, flags, result, damage1, damage2, hp1, hp2
+RECORD = struct.Struct("<IIBBBBBxiiii")
+
+BattleRecord = namedtuple(
+    "BattleRecord",
+    "battle turn action1 action2 first_attacker flags result damage1 damage2 hp1 hp2",
+)
+BattleRecord.__doc__ = """
+One turn of a battle.
+
+action1/action2 are Battle.Action values, result the Battle.Result value (0 while the battle goes on).
+A battle ended by Battle.max_turns or Battle.detect_cycles ends with a STALLED record:
+no actions (0), no damage and the hp of the monsters which were out.
+first_attacker is 1 or 2 for the team whose monster attacked first, 0 if nobody attacked.
+damage1 is the damage dealt by team 1's monster, damage2 by team 2's.
+hp1/hp2 are the hp of the two monsters which fought, at the end of the turn.
+flags is a combination of the flag constants in this module.
+"""
+
+LEVEL_UP1 = 1 << 0
+LEVEL_UP2 = 1 << 1
+EVOLVE1 = 1 << 2
+EVOLVE2 = 1 << 3
+RETRIEVE1 = 1 << 4
+RETRIEVE2 = 1 << 5
+STALLED = 1 << 6
+
+# (first record, number of turns) per battle
+INDEX_TYPECODE = "Q"
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+class BattleLogWriter:
+    """
+    Writes turn records to a log file through a buffered file object.
+    All methods are O(1) best/worst case, apart from close which writes the index in O(b) for b battles.
+    """
+
+    DEFAULT_BUFFER_SIZE = 1 << 16
+
+    def __init__(self, path: str, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self.path = path
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.records = 0
+        self.index = array(INDEX_TYPECODE)
+        self.battles = 0
+
+    def start_battle(self) -> int:
+        """Starts the records of a new battle and returns its id."""
+        battle = self.battles
+        self.battles += 1
+        self.index.append(self.records)
+        self.index.append(0)
+        return battle
+
+    def write_turn(
+        self, battle: int, turn: int, action1: int, action2: int, first_attacker: int,
+        flags: int, result: int, damage1: int, damage2: int, hp1: int, hp2: int,
+    ) -> None:
+        """Appends the record of one turn of `battle`."""
+        self.file.write(RECORD.pack(
+            battle, turn, action1, action2, first_attacker, flags, result, damage1, damage2, hp1, hp2,
+        ))
+        self.records += 1
+        self.index[2 * battle + 1] += 1
+
+    def close(self) -> None:
+        """Flushes the log and writes its index."""
+        if self.file.closed:
+            return
+        self.file.close()
+        with open(index_path(self.path), "wb") as f:
+            self.index.tofile(f)
+
+    def __enter__(self) -> BattleLogWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _iter_file(file: BinaryIO, count: int | None, chunk_records: int) -> Iterator[BattleRecord]:
+    """Yields up to count records (all if None) from the current position of file, chunk by chunk."""
+    while count is None or count > 0:
+        wanted = chunk_records if count is None else min(chunk_records, count)
+        chunk = file.read(wanted * RECORD.size)
+        usable = len(chunk) - len(chunk) % RECORD.size
+        if usable == 0:
+            return
+        for fields in RECORD.iter_unpack(chunk[:usable]):
+            yield BattleRecord._make(fields)
+        if count is not None:
+            count -= usable // RECORD.size
+        if usable < wanted * RECORD.size:
+            return
+
+
+def read_records(path: str, start: int = 0, count: int | None = None, chunk_records: int = 4096) -> Iterator[BattleRecord]:
+    """
+    Streams the records of a log, starting at record number `start`.
+    Only chunk_records records are held in memory at a time.
+    Best = Worst = O(r) for the r records read
+    """
+    with open(path, "rb") as file:
+        file.seek(start * RECORD.size)
+        yield from _iter_file(file, count, chunk_records)
+
+
+def build_index(path: str) -> array:
+    """
+    Rebuilds the index of a log by scanning it once, for logs whose .idx file is missing.
+    Best = Worst = O(r) for r records
+    """
+    index = array(INDEX_TYPECODE)
+    for number, record in enumerate(read_records(path)):
+        while len(index) < 2 * (record.battle + 1):
+            index.append(number)
+            index.append(0)
+        index[2 * record.battle + 1] += 1
+    return index
+
+
+class BattleLogIndex:
+    """
+    Random access to the battles and turns of a log through its index.
+    All lookups are O(1), reading a battle is O(k) for its k turns.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Loads <path>.idx, or scans the log if there is no index."""
+        self.path = path
+        if os.path.exists(index_path(path)):
+            self.index = array(INDEX_TYPECODE)
+            with open(index_path(path), "rb") as f:
+                self.index.frombytes(f.read())
+        else:
+            self.index = build_index(path)
+
+    def __len__(self) -> int:
+        """The number of battles in the log."""
+        return len(self.index) // 2
+
+    def turns(self, battle: int) -> int:
+        """The number of turns logged for a battle."""
+        self._check(battle)
+        return self.index[2 * battle + 1]
+
+    def offset(self, battle: int, turn: int = 1) -> int:
+        """The byte offset of a turn (turns start at 1) of a battle."""
+        if not 1 <= turn <= self.turns(battle):
+            raise IndexError(f"Battle {battle} has no turn {turn}")
+        return (self.index[2 * battle] + turn - 1) * RECORD.size
+
+    def read_turn(self, battle: int, turn: int) -> BattleRecord:
+        """Reads a single turn with one seek."""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset(battle, turn))
+            return BattleRecord._make(RECORD.unpack(f.read(RECORD.size)))
+
+    def battle_records(self, battle: int) -> Iterator[BattleRecord]:
+        """Streams every turn of one battle."""
+        return read_records(self.path, self.index[2 * battle], self.turns(battle))
+
+    def _check(self, battle: int) -> None:
+        if not 0 <= battle < len(self):
+            raise IndexError(f"No battle {battle} in the log")
@@ -0,0 +1,336 @@
+"""
+Battle simulation as a local asyncio service.
+
+Clients connect over a Unix socket or localhost TCP and send one JSON object per line.
+A battle request names two teams and a seed:
+```
+{"id": 1, "seed": 123, "team1": {"mode": "BACK"}, "team2": {"mode": "OPTIMISE", "sort_key": "HP", "monsters": ["Flamikin", "Aquariuma"]}}
+```
+A team without "monsters" is drawn with SelectionMode.RANDOM from the seed, otherwise the named
+classes are used with SelectionMode.PROVIDED. Every battle answers one line as soon as it is done,
+so results stream back in completion order and are matched to their request through "id":
+```
+{"id": 1, "result": "TEAM1", "latency_ms": 3.1}
+{"id": 2, "error": "Unknown monster Flamikinn"}
+```
+{"op": "stats"} answers the latency percentiles of the recent battles.
+
+Requests wait in a bounded asyncio.Queue. When it is full the connection stops being read
+until there is room again, which pushes back on the client through the socket.
+A dispatcher takes up to batch_size queued requests at once (waiting at most batch_delay for more)
+and runs each batch in a process pool, with at most `workers` batches in flight.
+
+Usage:
+```
+python battle_service.py --unix /tmp/battles.sock
+python battle_service.py --port 8765 --workers 4
+```
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from time import perf_counter
+
+from battle import Battle
+from helpers import get_all_monsters, warm_up
+from random_gen import RandomGen
+from team import MonsterTeam
+from data_structures.referential_array import ArrayR
+
+
+def make_team(spec: dict) -> MonsterTeam:
+    """
+    Build a team from its JSON spec, drawing from the current RandomGen seed if it has no monsters.
+    :raises ValueError: if the spec is not an object, names an unknown mode, sort key or monster,
+    or gives an empty list of monsters.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("A team should be a JSON object")
+    try:
+        team_mode = MonsterTeam.TeamMode[spec.get("mode", "BACK")]
+        sort_key = MonsterTeam.SortMode[spec["sort_key"]] if "sort_key" in spec else None
+    except KeyError as e:
+        raise ValueError(f"Unknown team mode or sort key {e}") from None
+    if team_mode == MonsterTeam.TeamMode.OPTIMISE and sort_key is None:
+        raise ValueError("An OPTIMISE team needs a sort_key")
+
+    names = spec.get("monsters")
+    if names is None:
+        return MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+    if not isinstance(names, list) or len(names) == 0:
+        raise ValueError("monsters should be a non-empty list of monster names")
+
+    monsters = get_all_monsters()
+    provided = ArrayR(len(names))
+    for i, name in enumerate(names):
+        for j in range(len(monsters)):
+            if monsters[j].get_name() == name:
+                provided[i] = monsters[j]
+                break
+        else:
+            raise ValueError(f"Unknown monster {name}")
+    return MonsterTeam(
+        team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=provided, sort_key=sort_key,
+    )
+
+
+def run_request(request: dict) -> dict:
+    """
+    Play one battle request, answering the result name or the error.
+    Any error is answered, so one bad request never fails the other requests of its batch.
+    """
+    try:
+        RandomGen.set_seed(int(request.get("seed", 0)))
+        team1 = make_team(request["team1"])
+        team2 = make_team(request["team2"])
+        result = Battle(verbosity=0, max_turns=Battle.DEFAULT_MAX_TURNS).battle(team1, team2)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    return {"result": result.name}
+
+
+def run_batch(requests: list[dict]) -> list[dict]:
+    """
+    Play a batch of requests in one executor call, in order.
+    Best = Worst = O(b * k * (e^2 + n)) for b requests of battles lasting k turns
+    """
+    return [run_request(request) for request in requests]
+
+
+class LatencyStats:
+    """
+    Latencies of the most recent `window` battles, in seconds.
+    record is O(1), percentiles is O(w log w) for the w samples kept.
+    """
+
+    DEFAULT_WINDOW = 10000
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, latency: float) -> None:
+        self.samples.append(latency)
+        self.count += 1
+
+    def percentiles(self) -> dict:
+        """Nearest-rank percentiles of the kept samples in milliseconds, with the total count."""
+        report = {"count": self.count}
+        ordered = sorted(self.samples)
+        for p in self.PERCENTILES:
+            if ordered:
+                rank = max(0, -(-p * len(ordered) // 100) - 1)
+                report[f"p{p}_ms"] = ordered[rank] * 1000
+            else:
+                report[f"p{p}_ms"] = None
+        return report
+
+
+class BattleService:
+    """
+    Queues battle requests from every connection, batches them and runs the batches on an executor.
+    """
+
+    DEFAULT_QUEUE_SIZE = 1024
+    DEFAULT_BATCH_SIZE = 32
+    DEFAULT_BATCH_DELAY = 0.002
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_delay: float = DEFAULT_BATCH_DELAY,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        workers defaults to the number of CPUs. An executor can be given instead of the
+        default process pool, for example a ThreadPoolExecutor when embedding the service.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size should be at least 1")
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.executor = executor
+        self.owns_executor = executor is None
+        self.stats = LatencyStats()
+        self.queue: asyncio.Queue | None = None
+        self.dispatcher: asyncio.Task | None = None
+        self.running = set()
+
+    async def start(self) -> None:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.in_flight = asyncio.Semaphore(self.workers)
+        self.dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self) -> None:
+        """
+        Stop taking batches off the queue. The batches already running are answered,
+        the requests still queued fail with a RuntimeError.
+        """
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+            try:
+                await self.dispatcher
+            except asyncio.CancelledError:
+                pass
+            self.dispatcher = None
+        if self.running:
+            await asyncio.gather(*self.running, return_exceptions=True)
+        if self.queue is not None:
+            while not self.queue.empty():
+                self._fail([self.queue.get_nowait()])
+        if self.owns_executor and self.executor is not None:
+            self.executor.shutdown()
+
+    async def enqueue(self, request: dict) -> asyncio.Future:
+        """
+        Queue a battle request, waiting for room first if the queue is full.
+        Returns the future of its answer.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((request, future, perf_counter()))
+        return future
+
+    async def submit(self, request: dict) -> dict:
+        """Queue a battle request and wait for its answer."""
+        return await (await self.enqueue(request))
+
+    async def _dispatch(self) -> None:
+        """Take batches off the queue for as long as the service runs."""
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                deadline = loop.time() + self.batch_delay
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                await self.in_flight.acquire()
+                task = asyncio.create_task(self._run(batch))
+                self.running.add(task)
+                task.add_done_callback(self.running.discard)
+                batch = []
+        except asyncio.CancelledError:
+            # the batch being gathered was taken off the queue, so close would not see it
+            self._fail(batch)
+            raise
+
+    @staticmethod
+    def _fail(batch: list) -> None:
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("The battle service was closed"))
+
+    async def _run(self, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            answers = await loop.run_in_executor(self.executor, run_batch, [request for request, _, _ in batch])
+        except Exception as e:
+            answers = [{"error": f"{type(e).__name__}: {e}"}] * len(batch)
+        finally:
+            self.in_flight.release()
+        done = perf_counter()
+        for (_, future, queued), answer in zip(batch, answers):
+            latency = done - queued
+            self.stats.record(latency)
+            if not future.done():
+                future.set_result(dict(answer, latency_ms=latency * 1000))
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection until the client closes it."""
+        lock = asyncio.Lock()
+        pending = set()
+
+        async def answer(request_id, response: dict) -> None:
+            if request_id is not None:
+                response = dict(response, id=request_id)
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        async def reply(request_id, future: asyncio.Future) -> None:
+            try:
+                response = await future
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            await answer(request_id, response)
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a request should be a JSON object")
+                except ValueError as e:
+                    await answer(None, {"error": f"Invalid request: {e}"})
+                    continue
+                if request.get("op") == "stats":
+                    await answer(request.get("id"), self.stats.percentiles())
+                    continue
+                # blocks on a full queue, so this connection is not read any further until there is room
+                future = await self.enqueue(request)
+                task = asyncio.create_task(reply(request.get("id"), future))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            for task in pending:
+                task.cancel()
+            raise
+        finally:
+            writer.close()
+
+
+async def serve(service: BattleService, host: str = "127.0.0.1", port: int = 8765, unix: str | None = None) -> None:
+    """Run the service until cancelled."""
+    await service.start()
+    if unix is not None:
+        server = await asyncio.start_unix_server(service.handle, path=unix)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Battle simulation service (JSON lines).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--queue-size", type=int, default=BattleService.DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BattleService.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    service = BattleService(args.workers, args.queue_size, args.batch_size)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+Seeded performance benchmarks for battles, teams, the battle tower and the data structures.
+
+Every workload is built from RandomGen after RandomGen.set_seed(seed), so two runs with the
+same seed time exactly the same battles, teams and operations.
+Results are written as JSON so runs can be compared over time.
+
+Usage (from the assignment directory):
+```
+python -m benchmarks                            # everything, written to benchmark_results.json
+python -m benchmarks --only battles tower       # some suites only
+python -m benchmarks --quick --output new.json --compare old.json
+```
+"""
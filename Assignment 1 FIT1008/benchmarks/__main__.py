@@ -0,0 +1,56 @@
+from __future__ import annotations
+import argparse
+import json
+
+from benchmarks import battles, memory, startup, structures, teams, tower
+from benchmarks.harness import compare, environment, write_results
+
+SUITES = {
+    "battles": battles,
+    "teams": teams,
+    "tower": tower,
+    "structures": structures,
+    "memory": memory,
+    "startup": startup,
+}
+
+DEFAULT_SEED = 129371
+QUICK_SCALE = 0.1
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Seeded performance benchmarks.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITES), help="suites to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help=f"scale every workload by {QUICK_SCALE}")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the size of every workload")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="print the throughput ratio against an earlier run")
+    args = parser.parse_args(argv)
+
+    scale = args.scale * (QUICK_SCALE if args.quick else 1.0)
+    results = {
+        "seed": args.seed,
+        "scale": scale,
+        "environment": environment(),
+        "suites": {},
+    }
+    for name in args.only or SUITES:
+        print(f"running {name}...")
+        results["suites"][name] = SUITES[name].run(args.seed, scale)
+    write_results(args.output, results)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        if old.get("seed") != args.seed or old.get("scale") != scale:
+            print("warning: the runs used different seeds or scales")
+        print(f"{'benchmark':<48}{'old ops/s':>14}{'new ops/s':>14}{'ratio':>9}")
+        for line in compare(old["suites"], results["suites"]):
+            print(line)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Battles per second for every combination of team modes."""
+from __future__ import annotations
+
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from benchmarks.harness import Timer, measure
+
+# the sort key used for TeamMode.OPTIMISE teams
+SORT_KEY = MonsterTeam.SortMode.HP
+
+BATTLES = 500
+REPEAT = 3
+
+
+def make_team(team_mode: MonsterTeam.TeamMode) -> MonsterTeam:
+    if team_mode == MonsterTeam.TeamMode.OPTIMISE:
+        return MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=SORT_KEY)
+    return MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM)
+
+
+def run(seed: int, scale: float = 1.0) -> dict:
+    """
+    Times Battle.battle only, the random teams are built outside the timed blocks.
+    Every repeat replays the same seeded teams.
+    """
+    battles = max(1, int(BATTLES * scale))
+    results = {}
+    for mode1 in MonsterTeam.TeamMode:
+        for mode2 in MonsterTeam.TeamMode:
+            def battle_run() -> Timer:
+                RandomGen.set_seed(seed)
+                timer = Timer()
+                battle = Battle(verbosity=0)
+                for _ in range(battles):
+                    team1 = make_team(mode1)
+                    team2 = make_team(mode2)
+                    with timer:
+                        battle.battle(team1, team2)
+                return timer
+
+            results[f"{mode1.name}_vs_{mode2.name}"] = measure(battle_run, REPEAT)
+    return results
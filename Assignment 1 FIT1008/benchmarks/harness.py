@@ -0,0 +1,86 @@
+from __future__ import annotations
+import json
+import platform
+import sys
+import time
+from time import perf_counter
+from typing import Callable
+
+
+class Timer:
+    """
+    Accumulates the time spent inside `with timer:` blocks, so setup done
+    between the blocks (building teams, regenerating them...) is not measured.
+    """
+
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+        self.count = 0
+
+    def __enter__(self) -> Timer:
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed += perf_counter() - self.started
+        self.count += 1
+
+
+def summarise(timings: list[float], operations: int) -> dict:
+    """
+    The best and mean of repeated timings of `operations` operations each,
+    with the throughput of the best run.
+    """
+    best = min(timings)
+    return {
+        "operations": operations,
+        "repeats": len(timings),
+        "best_s": best,
+        "mean_s": sum(timings) / len(timings),
+        "ops_per_s": operations / best if best > 0 else float("inf"),
+    }
+
+
+def measure(run: Callable[[], Timer], repeat: int) -> dict:
+    """
+    Call run `repeat` times, each call times its own operations with a Timer and
+    returns it, and summarise the timings as a dict (see summarise).
+    """
+    timings = []
+    operations = 0
+    for _ in range(repeat):
+        timer = run()
+        timings.append(timer.elapsed)
+        operations = timer.count
+    return summarise(timings, operations)
+
+
+def environment() -> dict:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(path: str, results: dict) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def compare(old: dict, new: dict, prefix: str = "") -> list[str]:
+    """
+    Lines giving the ops_per_s ratio new / old of every benchmark found in both result trees.
+    """
+    lines = []
+    for name, value in new.items():
+        if name not in old or not isinstance(value, dict):
+            continue
+        label = prefix + name
+        if "ops_per_s" in value and "ops_per_s" in old[name]:
+            ratio = value["ops_per_s"] / old[name]["ops_per_s"] if old[name]["ops_per_s"] else float("inf")
+            lines.append(f"{label:<48}{old[name]['ops_per_s']:>14.1f}{value['ops_per_s']:>14.1f}{ratio:>8.2f}x")
+        else:
+            lines.extend(compare(old[name], value, label + "."))
+    return lines
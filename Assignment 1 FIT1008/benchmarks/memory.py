@@ -0,0 +1,47 @@
+"""Bytes per monster instance, with __slots__ and with a per-instance __dict__."""
+from __future__ import annotations
+import gc
+import tracemalloc
+
+from helpers import get_all_monsters
+from random_gen import RandomGen
+
+INSTANCES = 20000
+
+
+def allocated_per_instance(monster_class: type, instances: int) -> float:
+    """
+    The bytes traced by tracemalloc while keeping `instances` monsters alive, per monster.
+    The list holding them is allocated before tracing starts.
+    """
+    monsters = [None] * instances
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(instances):
+        monsters[i] = monster_class()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / instances
+
+
+def run(seed: int, scale: float = 1.0) -> dict:
+    """
+    Compares a seeded choice of monster class with a subclass of it that does not declare
+    __slots__, which gives its instances a __dict__ like monsters had before.
+    """
+    instances = max(1, int(INSTANCES * scale))
+    RandomGen.set_seed(seed)
+    monsters = get_all_monsters()
+    monster_class = monsters[RandomGen.randint(0, len(monsters) - 1)]
+    dict_class = type(monster_class.__name__ + "WithDict", (monster_class, ), {})
+
+    slots = allocated_per_instance(monster_class, instances)
+    with_dict = allocated_per_instance(dict_class, instances)
+    return {
+        "monster_class": monster_class.get_name(),
+        "instances": instances,
+        "slots_bytes_per_instance": slots,
+        "dict_bytes_per_instance": with_dict,
+        "saving": 1 - slots / with_dict if with_dict else 0.0,
+    }
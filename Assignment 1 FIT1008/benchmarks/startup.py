@@ -0,0 +1,42 @@
+"""
+Cold start of battle and tower, with and without the compiled monster catalog cache:
+the import alone (nothing is loaded until first use) and the import followed by helpers.warm_up.
+"""
+from __future__ import annotations
+import os
+import subprocess
+import sys
+
+from helpers import CATALOG_CACHE_ENV, load_catalog
+from benchmarks.harness import summarise
+
+IMPORTS = 10
+
+# run in a fresh interpreter, so every import is cold, and time the imports only
+IMPORT = "import time; start = time.perf_counter(); import battle, tower; print(time.perf_counter() - start)"
+WARM_UP = (
+    "import time; start = time.perf_counter(); import battle, tower, helpers; helpers.warm_up(); "
+    "print(time.perf_counter() - start)"
+)
+
+
+def cold_import(script: str, cache: bool) -> float:
+    env = dict(os.environ, **{CATALOG_CACHE_ENV: "on" if cache else "off"})
+    output = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output)
+
+
+def run(seed: int, scale: float = 1.0) -> dict:
+    """
+    The seed is unused, importing draws no random numbers.
+    ops_per_s is imports per second.
+    """
+    imports = max(1, int(IMPORTS * scale))
+    # make sure the cache is fresh before timing the cached imports
+    load_catalog()
+    results = {"import": summarise([cold_import(IMPORT, True) for _ in range(imports)], 1)}
+    for name, cache in (("warm_up_cached_catalog", True), ("warm_up_yaml_catalog", False)):
+        results[name] = summarise([cold_import(WARM_UP, cache) for _ in range(imports)], 1)
+    return results
@@ -0,0 +1,102 @@
+"""Throughput of the ArraySortedList, CircularQueue, ArrayStack and BSet operations."""
+from __future__ import annotations
+from time import perf_counter
+
+from random_gen import RandomGen
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.bset import BSet
+from data_structures.queue_adt import CircularQueue
+from data_structures.referential_array import ArrayR
+from data_structures.sorted_list_adt import ListItem
+from data_structures.stack_adt import ArrayStack
+from benchmarks.harness import summarise
+
+ITEMS = 2000
+# BSet elements are 1..BSET_RANGE, the same order of magnitude as the Element enum
+BSET_RANGE = 32
+REPEAT = 5
+
+
+def timed(operation, items: int) -> dict:
+    """Times `operation()` REPEAT times, each call doing `items` operations."""
+    timings = []
+    for _ in range(REPEAT):
+        start = perf_counter()
+        operation()
+        timings.append(perf_counter() - start)
+    return summarise(timings, items)
+
+
+def run(seed: int, scale: float = 1.0) -> dict:
+    """
+    Fills and empties every structure with `items` seeded random keys.
+    The keys are drawn once, before anything is timed.
+    """
+    items = max(1, int(ITEMS * scale))
+    RandomGen.set_seed(seed)
+    keys = ArrayR(items)
+    for i in range(items):
+        keys[i] = RandomGen.randint(1, 1000)
+    elements = ArrayR(items)
+    for i in range(items):
+        elements[i] = RandomGen.randint(1, BSET_RANGE)
+
+    results = {}
+
+    sorted_list = ArraySortedList(items)
+
+    def sorted_add() -> None:
+        sorted_list.clear()
+        for i in range(items):
+            sorted_list.add(ListItem(i, keys[i]))
+
+    def sorted_delete_last() -> None:
+        sorted_add()
+        for _ in range(items):
+            sorted_list.delete_at_index(len(sorted_list) - 1)
+
+    results["ArraySortedList.add"] = timed(sorted_add, items)
+    results["ArraySortedList.add+delete_last"] = timed(sorted_delete_last, 2 * items)
+
+    queue = CircularQueue(items)
+
+    def queue_append_serve() -> None:
+        queue.clear()
+        for i in range(items):
+            queue.append(keys[i])
+        for _ in range(items):
+            queue.serve()
+
+    results["CircularQueue.append+serve"] = timed(queue_append_serve, 2 * items)
+
+    stack = ArrayStack(items)
+
+    def stack_push_pop() -> None:
+        stack.clear()
+        for i in range(items):
+            stack.push(keys[i])
+        for _ in range(items):
+            stack.pop()
+
+    results["ArrayStack.push+pop"] = timed(stack_push_pop, 2 * items)
+
+    bset = BSet()
+
+    def bset_add_contains() -> None:
+        bset.clear()
+        for i in range(items):
+            bset.add(elements[i])
+        for i in range(items):
+            elements[i] in bset
+
+    other = BSet()
+    for i in range(0, items, 2):
+        other.add(elements[i])
+
+    def bset_union_difference_len() -> None:
+        for _ in range(items):
+            len(bset.union(other).difference(other))
+
+    results["BSet.add+contains"] = timed(bset_add_contains, 2 * items)
+    results["BSet.union+difference+len"] = timed(bset_union_difference_len, items)
+    return results
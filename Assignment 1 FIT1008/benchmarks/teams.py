@@ -0,0 +1,46 @@
+"""Random teams generated per second, and the cost of MonsterTeam.special and regenerate_team, for every team mode."""
+from __future__ import annotations
+
+from random_gen import RandomGen
+from team import MonsterTeam
+from benchmarks.battles import make_team
+from benchmarks.harness import Timer, measure
+
+TEAMS = 200
+CALLS = 10
+REPEAT = 3
+
+
+def run(seed: int, scale: float = 1.0) -> dict:
+    """
+    Every team gets CALLS calls of the operation in a row,
+    on full random teams built outside the timed blocks.
+    """
+    teams = max(1, int(TEAMS * scale))
+    results = {}
+    for mode in MonsterTeam.TeamMode:
+        for operation in ("special", "regenerate_team"):
+            def team_run() -> Timer:
+                RandomGen.set_seed(seed)
+                timer = Timer()
+                for _ in range(teams):
+                    team = make_team(mode)
+                    method = getattr(team, operation)
+                    for _ in range(CALLS):
+                        with timer:
+                            method()
+                return timer
+
+            results[f"{mode.name}.{operation}"] = measure(team_run, REPEAT)
+
+        def generate_run() -> Timer:
+            RandomGen.set_seed(seed)
+            timer = Timer()
+            for _ in range(teams):
+                with timer:
+                    make_team(mode)
+            return timer
+
+        # ops_per_s is teams generated per second
+        results[f"{mode.name}.select_randomly"] = measure(generate_run, REPEAT)
+    return results
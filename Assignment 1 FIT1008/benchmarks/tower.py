@@ -0,0 +1,70 @@
+"""
+BattleTower.next_battle latency as the number of enemy teams grows,
+and the time and memory generate_teams takes for a tall tower.
+"""
+from __future__ import annotations
+import tracemalloc
+from time import perf_counter
+
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from tower import BattleTower
+from benchmarks.harness import Timer, measure, summarise
+
+ENEMY_COUNTS = (1, 10, 1000, 100000)
+NEXT_BATTLES = 50
+GENERATED_TEAMS = 20000
+REPEAT = 3
+
+
+def run(seed: int, scale: float = 1.0) -> dict:
+    """
+    Up to NEXT_BATTLES calls of next_battle per tower, stopping early when the tower is over.
+    Tower construction and generate_teams are not timed.
+    """
+    next_battles = max(1, int(NEXT_BATTLES * scale))
+    results = {}
+    for enemies in ENEMY_COUNTS:
+        def tower_run() -> Timer:
+            RandomGen.set_seed(seed)
+            timer = Timer()
+            tower = BattleTower(Battle(verbosity=0))
+            tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+            tower.generate_teams(enemies)
+            for _ in range(next_battles):
+                if not tower.battles_remaining():
+                    break
+                with timer:
+                    tower.next_battle()
+            return timer
+
+        result = measure(tower_run, REPEAT)
+        result["mean_latency_s"] = result["best_s"] / result["operations"] if result["operations"] else 0.0
+        results[f"enemies_{enemies}"] = result
+
+    results["generate_teams"] = generate_teams(seed, max(1, int(GENERATED_TEAMS * scale)))
+    return results
+
+
+def generate_teams(seed: int, teams: int) -> dict:
+    """
+    ops_per_s is enemy teams generated per second.
+    The bytes per team are traced in a separate, untimed call.
+    """
+    timings = []
+    for _ in range(REPEAT):
+        RandomGen.set_seed(seed)
+        tower = BattleTower(Battle(verbosity=0))
+        start = perf_counter()
+        tower.generate_teams(teams)
+        timings.append(perf_counter() - start)
+    result = summarise(timings, teams)
+
+    RandomGen.set_seed(seed)
+    tower = BattleTower(Battle(verbosity=0))
+    tracemalloc.start()
+    tower.generate_teams(teams)
+    result["bytes_per_team"] = tracemalloc.get_traced_memory()[0] / teams
+    tracemalloc.stop()
+    return result
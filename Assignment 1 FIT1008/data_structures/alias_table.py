@@ -0,0 +1,102 @@
+"""
+    Walker's alias method (Vose's construction) for drawing items with given weights.
+"""
+
+from __future__ import annotations
+from typing import Generic, TypeVar
+
+from data_structures.referential_array import ArrayR
+from data_structures.stack_adt import ArrayStack
+
+__docformat__ = 'reStructuredText'
+
+T = TypeVar('T')
+
+
+class AliasTable(Generic[T]):
+    """ Draws items at random, each with probability weight / total weight, in O(1) per draw.
+
+        Column i of the table holds item i with probability prob[i] and item alias[i] otherwise,
+        so a draw is one rng.randint to pick a column and one rng.random_float to pick between
+        the two, where rng is the random source given to sample. When every weight is equal the
+        table is skipped and a draw is the single rng.randint(0, n - 1), which is the same
+        sequence as a uniform choice.
+
+        Attributes:
+            items (ArrayR[T]): the items, in the order they were given
+            prob (ArrayR[float]): the chance of keeping the column's own item
+            alias (ArrayR[int]): the index of the other item of each column
+            uniform (bool): whether every weight is equal
+    """
+
+    def __init__(self, items: ArrayR[T], weights: ArrayR[float]) -> None:
+        """ Builds the table.
+        :complexity: O(n) best/worst case for n items
+        :raises ValueError: if there are no items, the lengths differ, a weight is negative or all are 0.
+        """
+        n = len(items)
+        if n == 0:
+            raise ValueError("An alias table needs at least one item")
+        if len(weights) != n:
+            raise ValueError("There should be one weight per item")
+        total = 0
+        for i in range(n):
+            if weights[i] < 0:
+                raise ValueError(f"Negative weight {weights[i]}")
+            total += weights[i]
+        if total <= 0:
+            raise ValueError("At least one weight should be positive")
+
+        self.items = items
+        self.uniform = all(weights[i] == weights[0] for i in range(n))
+        self.prob = ArrayR(n)
+        self.alias = ArrayR(n)
+
+        scaled = ArrayR(n)
+        small = ArrayStack(n)
+        large = ArrayStack(n)
+        for i in range(n):
+            scaled[i] = weights[i] * n / total
+            if scaled[i] < 1:
+                small.push(i)
+            else:
+                large.push(i)
+
+        # fill each under-full column with part of an over-full one
+        while not small.is_empty() and not large.is_empty():
+            less = small.pop()
+            more = large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            if scaled[more] < 1:
+                small.push(more)
+            else:
+                large.push(more)
+        # whatever is left is full, up to rounding errors
+        for stack in (large, small):
+            while not stack.is_empty():
+                i = stack.pop()
+                self.prob[i] = 1.0
+                self.alias[i] = i
+
+    def sample(self, rng) -> T:
+        """ Draws an item.
+        :param rng: the random source, anything with randint(low, high) and random_float() such as RandomGen
+        :complexity: O(1) best/worst case
+        """
+        return self.items[self.sample_index(rng)]
+
+    def sample_index(self, rng) -> int:
+        """ Draws the index of an item, with the same random numbers as sample.
+        :param rng: the random source, as for sample
+        :complexity: O(1) best/worst case
+        """
+        column = rng.randint(0, len(self.items) - 1)
+        if self.uniform or rng.random_float() < self.prob[column]:
+            return column
+        return self.alias[column]
+
+    def __len__(self) -> int:
+        """ The number of items. """
+        return len(self.items)
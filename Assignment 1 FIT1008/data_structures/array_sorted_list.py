@@ -121,6 +121,19 @@ class ArraySortedList(SortedList[T]):
         self[position] = item
         self.length += 1
 
+    def append(self, item: ListItem) -> None:
+        """
+        Add an item after every item already in the list, keeping the order of items with equal keys.
+        Used to restore a list from items that are already sorted; raises IndexError if the key of item
+        is smaller than the key of the last item.
+        Best case = Worst case = O(1), amortised over resizes, as nothing needs to be shuffled.
+        """
+        if self.is_full():
+            self._resize()
+
+        self[len(self)] = item
+        self.length += 1
+
     def _index_to_add(self, item: ListItem) -> int:
         """ 
         Find the position where the new item should be placed.
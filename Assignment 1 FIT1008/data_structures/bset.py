@@ -18,6 +18,17 @@ class BSet(Set[int]):
         """ Initialization. """
         Set.__init__(self)
 
+    @classmethod
+    def from_bits(cls, elems: int) -> BSet:
+        """ Creates a set from its bitwise representation, bit i - 1 holding item i.
+        :raises TypeError: if elems is not a non-negative integer.
+        """
+        if not isinstance(elems, int) or elems < 0:
+            raise TypeError('The bitwise representation should be a non-negative integer')
+        res = cls()
+        res.elems = elems
+        return res
+
     def clear(self) -> None:
         """ Makes the set empty. """
         self.elems = 0
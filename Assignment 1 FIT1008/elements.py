@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import mmap
+import os
+import struct
+import threading
 from enum import auto
 from typing import Optional
 
@@ -62,9 +66,22 @@ class EffectivenessCalculator:
 
     Usage:
         EffectivenessCalculator.get_effectiveness(elem1, elem2)
+
+    The CSV is the source of truth, but the singleton is loaded from a binary copy of the chart
+    (see write_binary) which is memory-mapped rather than parsed.
     """
 
     instance: Optional[EffectivenessCalculator] = None
+    # guards loading the singleton, which happens on first use rather than at import time
+    instance_lock = threading.Lock()
+
+    # relative to this file rather than the working directory
+    CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "type_effectiveness.csv")
+    BINARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "type_effectiveness.bin")
+    # magic, version, element count, padding, size and mtime_ns of the CSV it was built from
+    BINARY_HEADER = struct.Struct("<4sIIIqq")
+    BINARY_MAGIC = b"EFF1"
+    BINARY_VERSION = 1
 
     def __init__(self, element_names: ArrayR[str], effectiveness_values: ArrayR[float]) -> None:
         """
@@ -83,35 +100,118 @@ class EffectivenessCalculator:
         Water is double effective to Fire, and half effective to Water and Grass [2, 0.5, 0.5]
         Grass is half effective to Fire and Grass, and double effective to Water [0.5, 2, 0.5]
 
-        Best = Worst = O(1), as there are only assignments and arithmetic operations which are constant time
+        The values are also laid out once in self.matrix, an e*e ArrayR indexed by Element.value,
+        so that get_effectiveness does not have to search element_names.
+        e is the number of elements in the Element enum
+
+        Best = Worst = O(e^2), as every element name is searched for once and every pair is copied once
         """
         self.elements_names = element_names
         self.effectiveness_values = effectiveness_values
+        self.element_count = len(Element)
+
+        # position of each Element in element_names, None if the chart does not have it
+        positions = ArrayR(self.element_count)
+        for element in Element:
+            try:
+                positions[element.value - 1] = element_names.index(element.name.title())
+            except ValueError:
+                pass
+
+        self.matrix = ArrayR(self.element_count * self.element_count)
+        for attacker in Element:
+            for defender in Element:
+                row = positions[attacker.value - 1]
+                column = positions[defender.value - 1]
+                if row is not None and column is not None:
+                    self.matrix[(attacker.value - 1) * self.element_count + defender.value - 1] = \
+                        effectiveness_values[row * len(element_names) + column]
 
     @classmethod
     def get_effectiveness(cls, type1: Element, type2: Element) -> float:
 
         """
         Returns the effectivness of elem1 attacking elem2.
-        O(e), where e is the number of elemental types in cls.instance.elements_names. which is not a constant as the number of elements can increase
-        Thus when a for loop is running to loop through the element names and find the index of the element, it is O(e)
-        Best case:  O(1) is when the element is the first element in the list
-        Worst case: O(e) is when the element is the last element in the list
+        Best = Worst = O(1), as it is a single read of the matrix built in __init__, indexed by the Element values
 
         Example: EffectivenessCalculator.get_effectiveness(Element.FIRE, Element.WATER) == 0.5
         """
-        # loop through the elements names to find the index of the element1 using index function=
-        index1 = cls.instance.elements_names.index(type1.name.title())
+        instance = cls.instance
+        if instance is None:
+            instance = cls.get_instance()
+        effectiveness = instance.matrix[(type1.value - 1) * instance.element_count + type2.value - 1]
+        # missing pairs are None in a matrix built from the CSV and NaN in a mapped one
+        if effectiveness is None or effectiveness != effectiveness:
+            raise ValueError("Value does not exist")
+        return effectiveness
 
-        # loop through the elements names to find the index of the element2 using index function
-        index2 = cls.instance.elements_names.index(type2.name.title())
+    def write_binary(self, binary_file: str, csv_file: str) -> None:
+        """
+        Write the matrix as a header followed by e*e little-endian float64 values, in Element
+        value order, with NaN for missing pairs. The header records the size and mtime of csv_file
+        so from_binary can tell when the binary is stale. The file is replaced atomically.
+        Best = Worst = O(e^2)
+        """
+        stat = os.stat(csv_file)
+        values = [float("nan") if value is None else value for value in self.matrix]
+        temp_file = f"{binary_file}.{os.getpid()}.tmp"
+        with open(temp_file, "wb") as file:
+            file.write(self.BINARY_HEADER.pack(
+                self.BINARY_MAGIC, self.BINARY_VERSION, self.element_count, 0, stat.st_size, stat.st_mtime_ns,
+            ))
+            file.write(struct.pack(f"<{len(values)}d", *values))
+        os.replace(temp_file, binary_file)
 
-        # calculate the effectiveness by multiplying the index of element1 and the length of the elements names
-        # and adding the index of element2 to get the effectiveness based on type_effectiveness.csv
-        effective_index = index1 * len(cls.instance.elements_names) + index2
-        effectiveness = cls.instance.effectiveness_values[effective_index]
+    @classmethod
+    def from_binary(cls, binary_file: str, csv_file: Optional[str] = None) -> Optional[EffectivenessCalculator]:
+        """
+        Map a chart written by write_binary, or return None if it is missing, not for this Element enum,
+        or older than csv_file (when given).
+        The matrix is a read-only memoryview of the mapped pages, so nothing is parsed or copied
+        and every process mapping the file shares the same pages.
+        Best = Worst = O(1)
+        """
+        try:
+            with open(binary_file, "rb") as file:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        element_count = len(Element)
+        if len(mapped) != cls.BINARY_HEADER.size + 8 * element_count * element_count:
+            mapped.close()
+            return None
+        magic, version, count, _, csv_size, csv_mtime_ns = cls.BINARY_HEADER.unpack_from(mapped)
+        stale = False
+        if csv_file is not None:
+            stat = os.stat(csv_file)
+            stale = (csv_size, csv_mtime_ns) != (stat.st_size, stat.st_mtime_ns)
+        if magic != cls.BINARY_MAGIC or version != cls.BINARY_VERSION or count != element_count or stale:
+            mapped.close()
+            return None
 
-        return effectiveness
+        calculator = cls.__new__(cls)
+        calculator.element_count = element_count
+        calculator.mapped = mapped
+        calculator.matrix = memoryview(mapped)[cls.BINARY_HEADER.size:].cast("d")
+        calculator.elements_names = ArrayR.from_list([element.name.title() for element in Element])
+        calculator.effectiveness_values = calculator.matrix
+        return calculator
+
+    @classmethod
+    def load(cls, csv_file: str = CSV_PATH, binary_file: str = BINARY_PATH) -> EffectivenessCalculator:
+        """
+        Map the binary chart if it is up to date with the CSV, otherwise parse the CSV
+        and write the binary for the next load (failing to write it is not an error).
+        """
+        calculator = cls.from_binary(binary_file, csv_file)
+        if calculator is not None:
+            return calculator
+        calculator = cls.from_csv(csv_file)
+        try:
+            calculator.write_binary(binary_file, csv_file)
+        except OSError:
+            pass
+        return calculator
 
     @classmethod
     def from_csv(cls, csv_file: str) -> EffectivenessCalculator:
@@ -129,11 +229,49 @@ class EffectivenessCalculator:
                 a_all[i] = float(rest[i])
             return EffectivenessCalculator(a_header, a_all)
 
+    @classmethod
+    def reload(cls, csv_file: str = CSV_PATH, binary_file: str = BINARY_PATH) -> ArrayR[Element]:
+        """
+        Re-read the CSV and return the attacking elements whose row of the chart changed.
+        If any did, the binary is rewritten and the singleton replaced by a mapping of it,
+        otherwise the current singleton is kept.
+        Best = Worst = O(e^2)
+        """
+        calculator = cls.from_csv(csv_file)
+        current = cls.get_instance()
+        changed = []
+        for attacker in Element:
+            start = (attacker.value - 1) * calculator.element_count
+            for i in range(start, start + calculator.element_count):
+                old, new = current.matrix[i], calculator.matrix[i]
+                # None (missing in the CSV) and NaN (missing in the binary) are the same
+                if old != new and not ((old is None or old != old) and new is None):
+                    changed.append(attacker)
+                    break
+        if changed:
+            try:
+                calculator.write_binary(binary_file, csv_file)
+                mapped = cls.from_binary(binary_file, csv_file)
+                if mapped is not None:
+                    calculator = mapped
+            except OSError:
+                pass
+            cls.instance = calculator
+        return ArrayR.from_list(changed)
+
     @classmethod
     def make_singleton(cls):
-        cls.instance = EffectivenessCalculator.from_csv("type_effectiveness.csv")
+        with cls.instance_lock:
+            cls.instance = EffectivenessCalculator.load()
 
-EffectivenessCalculator.make_singleton()
+    @classmethod
+    def get_instance(cls) -> EffectivenessCalculator:
+        """The singleton, loaded on first use. Safe to call from several threads, only one loads it."""
+        if cls.instance is None:
+            with cls.instance_lock:
+                if cls.instance is None:
+                    cls.instance = EffectivenessCalculator.load()
+        return cls.instance
 
 
 if __name__ == "__main__":
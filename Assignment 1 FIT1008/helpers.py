@@ -1,62 +1,282 @@
+"""
+The monster catalog: one MonsterBase subclass per entry of monsters.yaml.
+
+Nothing is loaded at import time. The catalog is built, once and under a lock, the first time it
+is needed: by get_all_monsters(), or by reading a monster class from this module, e.g.
+`from helpers import Flamikin` or `helpers.Flamikin`. Pools which would rather pay for loading
+up front can call warm_up() from their initializer.
+"""
 from __future__ import annotations
-import yaml
+import hashlib
+import marshal
+import os
+import threading
 from typing import TYPE_CHECKING
 
 from data_structures.referential_array import ArrayR
 
 if TYPE_CHECKING:
+    from data_structures.alias_table import AliasTable
     from monster_base import MonsterBase
+    from stat_table import StatTable
 
 
 _monsters: ArrayR[MonsterBase] = None
+# the classes of _monsters which can be spawned, in catalog order
+_spawnable: ArrayR[MonsterBase] = None
+# draws from _spawnable by spawn_weight, None when nothing can be spawned
+_spawn_table: AliasTable = None
+_stat_table: StatTable = None
+# the catalog entries _monsters was built from, to tell what a reload changed
+_catalog: list[dict] = None
+# bumped by every reload that changes a class, so what was derived from the classes can tell it is stale
+_catalog_version = 0
+# guards building and reloading the catalog and the stat table
+_lock = threading.RLock()
+
+# relative to this file rather than the working directory
+MONSTERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "monsters.yaml")
+# bump when the layout of the cache file changes
+CATALOG_CACHE_VERSION = 1
+# set to "off" to always parse the YAML, for example to time the uncached startup
+CATALOG_CACHE_ENV = "MONSTER_CATALOG_CACHE"
 
 
-def MonsterBaseFactory(name, description, evolution, element, simple_stats, complex_stats, can_be_spawned) -> type[MonsterBase]:
+def MonsterBaseFactory(name, description, evolution, element, simple_stats, complex_stats, can_be_spawned, spawn_weight=1) -> type[MonsterBase]:
     from monster_base import MonsterBase
     return type(name, (MonsterBase, ), {
+        # no per-instance __dict__, the attributes are the slots of MonsterBase
+        "__slots__": (),
+        **_class_methods(name, description, element, simple_stats, complex_stats, can_be_spawned, spawn_weight),
+    })
+
+def _class_methods(name, description, element, simple_stats, complex_stats, can_be_spawned, spawn_weight=1) -> dict:
+    """The classmethods a monster class gets from its catalog entry."""
+    from elements import Element
+    element_type = Element.from_string(element)
+    # the bit of the element in a BSet of element values
+    element_bit = 1 << (element_type.value - 1)
+    return {
         "get_name": classmethod(lambda s: name),
         "get_description": classmethod(lambda s: description),
         # This will be defined later when we have all names.
         "get_evolution": classmethod(lambda s: None),
         "get_element": classmethod(lambda s: element),
+        "get_element_type": classmethod(lambda s: element_type),
+        "get_element_bit": classmethod(lambda s: element_bit),
         "get_simple_stats": classmethod(lambda s: simple_stats),
         "get_complex_stats": classmethod(lambda s: complex_stats),
         "can_be_spawned": classmethod(lambda s: can_be_spawned),
-    })
+        "get_spawn_weight": classmethod(lambda s: spawn_weight),
+    }
 
 def get_all_monsters() -> ArrayR[type[MonsterBase]]:
+    """
+    Every monster class, building the catalog on first use.
+    Safe to call from several threads, only the first call loads anything.
+    """
     if _monsters is None:
-        _make_all_monster_classes()
+        with _lock:
+            if _monsters is None:
+                _make_all_monster_classes()
     return _monsters
 
-def _make_all_monster_classes():
-    from stats import SimpleStats, ComplexStats
-    global _monsters
-    with open("monsters.yaml", "r") as f:
-        monsters_yaml = yaml.safe_load(f)
-    _monsters = ArrayR(len(monsters_yaml))
-    idx = 0
+def get_spawnable_monsters() -> ArrayR[type[MonsterBase]]:
+    """
+    The monster classes which can be spawned, in the order of get_all_monsters().
+    Built with the catalog (and rebuilt by reload_monsters), so picking one is a single indexed read.
+    """
+    get_all_monsters()
+    return _spawnable
+
+def get_catalog_version() -> int:
+    """
+    How many reloads have changed the monster classes so far. Anything derived from the classes
+    outside the catalog (such as the element counts of a team) can keep the version it was
+    computed at and recompute when it differs. Does not load the catalog.
+    """
+    return _catalog_version
+
+def get_spawn_table() -> AliasTable:
+    """
+    The alias table drawing from get_spawnable_monsters() by spawn weight, or None if no monster
+    can be spawned. Built with the catalog and rebuilt by reload_monsters, so a draw is O(1)
+    whatever the size of the catalog.
+    """
+    get_all_monsters()
+    return _spawn_table
+
+def _make_spawnable(monsters: ArrayR[type[MonsterBase]]) -> ArrayR[type[MonsterBase]]:
+    return ArrayR.from_list([monsters[i] for i in range(len(monsters)) if monsters[i].can_be_spawned()])
+
+def _make_spawn_table(spawnable: ArrayR[type[MonsterBase]]) -> AliasTable:
+    from data_structures.alias_table import AliasTable
+    if len(spawnable) == 0:
+        return None
+    weights = ArrayR(len(spawnable))
+    for i in range(len(spawnable)):
+        weights[i] = spawnable[i].get_spawn_weight()
+    return AliasTable(spawnable, weights)
+
+def _spawn_weight(monster: dict) -> float:
+    """The optional spawn_weight of a catalog entry, 1 when missing."""
+    weight = monster.get("spawn_weight", 1)
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not weight >= 0:
+        raise ValueError(f"Invalid spawn_weight for {monster['name']}: {weight!r}")
+    return weight
+
+def _check_spawn_weights(monsters_yaml: list[dict]) -> None:
+    """Every spawn_weight is valid, and one of the spawnable monsters at least has a positive one."""
+    spawnable = False
+    positive = False
     for monster in monsters_yaml:
-        simple = monster["simple"]
-        complex = monster["complex"]
-        new_class = MonsterBaseFactory(
-            monster["name"],
-            monster["description"],
-            monster.get("evolution", None),
-            monster["element"],
-            SimpleStats(simple["attack"], simple["defense"], simple["speed"], simple["max_hp"]),
-            ComplexStats(
-                ArrayR.from_list(str(complex["attack"]).split()),
-                ArrayR.from_list(str(complex["defense"]).split()),
-                ArrayR.from_list(str(complex["speed"]).split()),
-                ArrayR.from_list(str(complex["max_hp"]).split()),
-            ),
-            monster.get("can_be_spawned", False)
+        weight = _spawn_weight(monster)
+        if monster.get("can_be_spawned", False):
+            spawnable = True
+            positive = positive or weight > 0
+    if spawnable and not positive:
+        raise ValueError("Every spawnable monster has a spawn_weight of 0")
+
+def __getattr__(name: str) -> type[MonsterBase]:
+    """Monster classes are module attributes, which only exist once the catalog is built."""
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    get_all_monsters()
+    try:
+        return globals()[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+def get_stat_table() -> StatTable:
+    """
+    The StatTable of every monster in get_all_monsters(), built on first use.
+    Class i of the table is get_all_monsters()[i].
+    """
+    global _stat_table
+    if _stat_table is None:
+        with _lock:
+            if _stat_table is None:
+                from stat_table import StatTable
+                _stat_table = StatTable(get_all_monsters())
+    return _stat_table
+
+def warm_up(stat_table: bool = False) -> None:
+    """
+    Load the monster catalog and the type effectiveness chart now instead of on first use,
+    and the stat table too if asked. Meant as a pool initializer:
+    ```
+    ProcessPoolExecutor(initializer=helpers.warm_up)
+    ```
+    """
+    from elements import EffectivenessCalculator
+    EffectivenessCalculator.get_instance()
+    get_all_monsters()
+    if stat_table:
+        get_stat_table()
+
+def reload_stat_table() -> StatTable:
+    """Rebuild the StatTable from the current get_all_monsters()."""
+    table = get_stat_table()
+    with _lock:
+        table.reload(get_all_monsters())
+    return table
+
+def catalog_cache_path(path: str = MONSTERS_PATH) -> str:
+    return path + ".cache"
+
+def load_catalog(path: str = MONSTERS_PATH) -> list[dict]:
+    """
+    The parsed monster catalog, read from its marshal cache when the cache is still fresh.
+
+    The cache holds the parsed YAML with the size, mtime and SHA-256 of the file it came from.
+    It is used as is when the size and mtime match, or when only the mtime changed but the hash
+    still matches (the cache is then rewritten with the new mtime). Otherwise the YAML is parsed
+    and the cache rewritten. PyYAML is only imported when the YAML has to be parsed.
+    """
+    use_cache = os.environ.get(CATALOG_CACHE_ENV, "on") != "off"
+    cache_path = catalog_cache_path(path)
+    stat = os.stat(path)
+    digest = None
+    if use_cache:
+        try:
+            with open(cache_path, "rb") as f:
+                version, size, mtime_ns, cached_digest, catalog = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            version = None
+        if version == CATALOG_CACHE_VERSION and size == stat.st_size:
+            if mtime_ns == stat.st_mtime_ns:
+                return catalog
+            digest = _file_digest(path)
+            if digest == cached_digest:
+                _write_catalog_cache(cache_path, stat, digest, catalog)
+                return catalog
+
+    import yaml
+    with open(path, "r") as f:
+        catalog = yaml.safe_load(f)
+    if use_cache:
+        _write_catalog_cache(cache_path, stat, digest or _file_digest(path), catalog)
+    return catalog
+
+def _file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _write_catalog_cache(cache_path: str, stat: os.stat_result, digest: str, catalog: list[dict]) -> None:
+    """Write the cache through a temporary file, so a reader never sees half of it. Failures are ignored."""
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            marshal.dump((CATALOG_CACHE_VERSION, stat.st_size, stat.st_mtime_ns, digest, catalog), f)
+        os.replace(temp_path, cache_path)
+    except (OSError, ValueError):
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def _make_stats(monster: dict) -> tuple:
+    """The SimpleStats and ComplexStats of a catalog entry."""
+    from stats import SimpleStats, ComplexStats
+    simple = monster["simple"]
+    complex = monster["complex"]
+    # the formulas are compiled here, so a malformed one fails the catalog load
+    try:
+        complex_stats = ComplexStats(
+            ArrayR.from_list(str(complex["attack"]).split()),
+            ArrayR.from_list(str(complex["defense"]).split()),
+            ArrayR.from_list(str(complex["speed"]).split()),
+            ArrayR.from_list(str(complex["max_hp"]).split()),
         )
-        globals()[monster["name"]] = new_class
-        _monsters[idx] = new_class
-        idx += 1
-    # Now assign evolution
+    except ValueError as e:
+        raise ValueError(f"Invalid complex stats for {monster['name']}: {e}") from e
+    return SimpleStats(simple["attack"], simple["defense"], simple["speed"], simple["max_hp"]), complex_stats
+
+def _make_class(monster: dict, stats: tuple) -> type[MonsterBase]:
+    return MonsterBaseFactory(
+        monster["name"],
+        monster["description"],
+        monster.get("evolution", None),
+        monster["element"],
+        stats[0],
+        stats[1],
+        monster.get("can_be_spawned", False),
+        _spawn_weight(monster),
+    )
+
+def _entry_methods(monster: dict, stats: tuple) -> dict:
+    """The classmethods of a catalog entry, see _class_methods. Raises if the entry is invalid."""
+    return _class_methods(
+        monster["name"], monster["description"], monster["element"], stats[0], stats[1],
+        monster.get("can_be_spawned", False), _spawn_weight(monster),
+    )
+
+def _update_class(monster_class: type[MonsterBase], methods: dict) -> None:
+    """Give an existing monster class the methods of a new catalog entry, keeping the class object."""
+    for attribute, method in methods.items():
+        setattr(monster_class, attribute, method)
+
+def _link_evolutions(monsters_yaml: list[dict]) -> None:
     for monster in monsters_yaml:
         evolution = monster.get("evolution", None)
         if evolution is None:
@@ -65,7 +285,95 @@ def _make_all_monster_classes():
         globals()[monster["name"]].evolution_class = evolution_class
         globals()[monster["name"]].get_evolution = classmethod(lambda s: s.evolution_class)
 
-get_all_monsters()
+def _make_all_monster_classes():
+    global _monsters, _spawnable, _spawn_table, _catalog
+    monsters_yaml = load_catalog()
+    _check_spawn_weights(monsters_yaml)
+    monsters = ArrayR(len(monsters_yaml))
+    idx = 0
+    for monster in monsters_yaml:
+        new_class = _make_class(monster, _make_stats(monster))
+        globals()[monster["name"]] = new_class
+        monsters[idx] = new_class
+        idx += 1
+    # Now assign evolution
+    _link_evolutions(monsters_yaml)
+    _catalog = monsters_yaml
+    _spawnable = _make_spawnable(monsters)
+    _spawn_table = _make_spawn_table(_spawnable)
+    # published last, so get_all_monsters never returns a half built catalog
+    _monsters = monsters
+
+def reload_monsters(path: str = MONSTERS_PATH) -> tuple[ArrayR[type[MonsterBase]], bool]:
+    """
+    Re-read the catalog and rebuild only the monster classes whose entry changed.
+
+    A changed class keeps its identity: its methods are replaced on the existing class object,
+    so live instances, teams and anything keyed by the class stay valid. New entries get new
+    classes. Removed entries leave get_all_monsters() but their class keeps working.
+    Every changed entry is validated before any class is touched, so a bad edit changes nothing.
+
+    Dependent caches are invalidated selectively: the MonsterBase.stat_cache entries of the changed
+    classes, and their rows of the StatTable (all of it if classes were added, removed or reordered).
+
+    Returns the changed (or new) classes and whether the list of monsters itself changed.
+    c is the number of monster classes and l the max level of the stat table
+    Best case: O(c) when nothing changed, Worst case: O(c * l) when every class changed
+    """
+    with _lock:
+        return _reload_monsters(path)
+
+def _reload_monsters(path: str) -> tuple[ArrayR[type[MonsterBase]], bool]:
+    global _monsters, _spawnable, _spawn_table, _catalog, _catalog_version
+    from monster_base import MonsterBase
+    get_all_monsters()
+    old_entries = {monster["name"]: monster for monster in _catalog}
+    monsters_yaml = load_catalog(path)
+    _check_spawn_weights(monsters_yaml)
+    names = {monster["name"] for monster in monsters_yaml}
+    for monster in monsters_yaml:
+        if monster.get("evolution", None) not in names | {None}:
+            raise ValueError(f"Unknown evolution {monster['evolution']} for {monster['name']}")
+
+    # build the methods of every changed entry, and every new class, before touching anything,
+    # so an invalid entry raises here and leaves the catalog as it was
+    updates = []
+    for monster in monsters_yaml:
+        if old_entries.get(monster["name"]) == monster:
+            continue
+        stats = _make_stats(monster)
+        if monster["name"] in old_entries:
+            updates.append((monster["name"], _entry_methods(monster, stats), None))
+        else:
+            updates.append((monster["name"], None, _make_class(monster, stats)))
+
+    changed = ArrayR(len(updates))
+    for i, (name, methods, new_class) in enumerate(updates):
+        if new_class is None:
+            _update_class(globals()[name], methods)
+        else:
+            globals()[name] = new_class
+        changed[i] = globals()[name]
+
+    structural = [monster["name"] for monster in monsters_yaml] != [monster["name"] for monster in _catalog]
+    if structural:
+        _monsters = ArrayR.from_list([globals()[monster["name"]] for monster in monsters_yaml])
+    _link_evolutions(monsters_yaml)
+    _catalog = monsters_yaml
+    _spawnable = _make_spawnable(_monsters)
+    _spawn_table = _make_spawn_table(_spawnable)
+    if len(changed) > 0 or structural:
+        _catalog_version += 1
+
+    for i in range(len(changed)):
+        MonsterBase.stat_cache.invalidate(changed[i])
+    if _stat_table is not None:
+        if structural:
+            _stat_table.reload(_monsters)
+        else:
+            for i in range(len(changed)):
+                _stat_table.reload_class(_monsters.index(changed[i]))
+    return changed, structural
 
 if TYPE_CHECKING:
     # Makes no sense but fixes the red squigglies
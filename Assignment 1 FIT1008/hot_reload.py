@@ -0,0 +1,153 @@
+"""
+Hot reload of monsters.yaml and the type effectiveness chart in a long-running process.
+
+A HotReloader polls the size and mtime of both source files. When one changes it rebuilds only
+what changed (see helpers.reload_monsters and EffectivenessCalculator.reload), which also drops
+the affected entries of the built-in caches, then tells every registered listener what changed
+so other caches (matchup results, BatchBattle matrices...) can be invalidated selectively.
+
+Usage:
+```
+reloader = HotReloader(interval=2.0)
+reloader.add_listener(lambda event: print(event))
+reloader.start()     # polls in a daemon thread
+...
+reloader.stop()
+```
+or call reloader.check() from an existing loop instead of starting the thread.
+"""
+from __future__ import annotations
+import os
+import threading
+from typing import Callable, Optional
+
+import helpers
+from elements import EffectivenessCalculator, Element
+from data_structures.referential_array import ArrayR
+
+
+class ReloadEvent:
+    """
+    What one reload changed.
+    kind is MONSTERS or CHART. For MONSTERS, classes are the rebuilt (or new) monster classes and
+    structural tells whether monsters were added, removed or reordered. For CHART, elements are the
+    attacking elements whose row changed.
+    """
+
+    MONSTERS = "monsters"
+    CHART = "chart"
+
+    def __init__(
+        self,
+        kind: str,
+        classes: Optional[ArrayR[type]] = None,
+        structural: bool = False,
+        elements: Optional[ArrayR[Element]] = None,
+    ) -> None:
+        self.kind = kind
+        self.classes = classes if classes is not None else ArrayR(0)
+        self.structural = structural
+        self.elements = elements if elements is not None else ArrayR(0)
+
+    def __str__(self) -> str:
+        if self.kind == ReloadEvent.MONSTERS:
+            names = ", ".join(self.classes[i].get_name() for i in range(len(self.classes)))
+            return f"ReloadEvent(monsters: {names or 'none'}{', structural' if self.structural else ''})"
+        names = ", ".join(self.elements[i].name for i in range(len(self.elements)))
+        return f"ReloadEvent(chart rows: {names or 'none'})"
+
+
+class HotReloader:
+    """
+    Polls the monster catalog and the effectiveness chart for changes.
+    check is O(1) when nothing changed, see the reload functions otherwise.
+    A failed reload (for example a half-written or malformed file) is reported through on_error
+    and retried at the next change, the previous monsters and chart stay in use.
+    """
+
+    DEFAULT_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        monsters_path: str = helpers.MONSTERS_PATH,
+        chart_path: str = EffectivenessCalculator.CSV_PATH,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        self.interval = interval
+        self.monsters_path = monsters_path
+        self.chart_path = chart_path
+        self.on_error = on_error
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.monsters_stamp = self._stamp(monsters_path)
+        self.chart_stamp = self._stamp(chart_path)
+
+    def add_listener(self, listener: Callable[[ReloadEvent], None]) -> None:
+        """Call listener(event) after every reload that changed something."""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[ReloadEvent], None]) -> None:
+        self.listeners.remove(listener)
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def check(self) -> ArrayR[ReloadEvent]:
+        """Reload whatever changed since the last check and return the events sent to the listeners."""
+        events = []
+        with self.lock:
+            stamp = self._stamp(self.monsters_path)
+            if stamp is not None and stamp != self.monsters_stamp:
+                self.monsters_stamp = stamp
+                try:
+                    classes, structural = helpers.reload_monsters(self.monsters_path)
+                    if len(classes) > 0 or structural:
+                        events.append(ReloadEvent(ReloadEvent.MONSTERS, classes=classes, structural=structural))
+                except Exception as e:
+                    self._error(e)
+
+            stamp = self._stamp(self.chart_path)
+            if stamp is not None and stamp != self.chart_stamp:
+                self.chart_stamp = stamp
+                try:
+                    elements = EffectivenessCalculator.reload(self.chart_path)
+                    if len(elements) > 0:
+                        events.append(ReloadEvent(ReloadEvent.CHART, elements=elements))
+                except Exception as e:
+                    self._error(e)
+
+        for event in events:
+            for listener in self.listeners:
+                listener(event)
+        return ArrayR.from_list(events)
+
+    def _error(self, error: Exception) -> None:
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def start(self) -> None:
+        """Poll every interval seconds in a daemon thread."""
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="hot-reload", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+    def _run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            self.check()
@@ -1,13 +1,24 @@
 from __future__ import annotations
 import abc
 from elements import Element, EffectivenessCalculator
+from stats import StatCache
 from math import ceil
 
 class MonsterBase(abc.ABC):
     """
     Unless Stated otherwise all Complexity is O(1) 
+
+    Complex stats are looked up in stat_cache, shared by every monster,
+    so level_up and evolve only recompute a stat the first time a (class, level) is seen.
+
+    Instances have no __dict__, their four attributes live in __slots__
+    (the monster classes made by helpers.MonsterBaseFactory declare empty __slots__ too).
     """
 
+    __slots__ = ("simple_mode", "level", "original_level", "current_hp")
+
+    stat_cache = StatCache()
+
     def __init__(self, simple_mode=True, level:int=1) -> None:
         """
         Initialise an instance of a monster.
@@ -33,6 +44,11 @@ class MonsterBase(abc.ABC):
         self.set_hp(self.get_max_hp() - difference)
 
 
+    def reset(self) -> None:
+        """Put this monster instance back to its starting level with full HP, as when it was created"""
+        self.level = self.original_level
+        self.current_hp = self.get_max_hp()
+
     def get_hp(self):
         """Get the current HP of this monster instance"""
         return self.current_hp
@@ -46,28 +62,28 @@ class MonsterBase(abc.ABC):
         if self.simple_mode:
             return self.get_simple_stats().get_attack()
         else:
-            return self.get_complex_stats().get_attack()
+            return MonsterBase.stat_cache.get(type(self), self.level, StatCache.ATTACK)
 
     def get_defense(self):
         """Get the defense of this monster instance"""
         if self.simple_mode:
             return self.get_simple_stats().get_defense()
         else:
-            return self.get_complex_stats().get_defense()
+            return MonsterBase.stat_cache.get(type(self), self.level, StatCache.DEFENSE)
 
     def get_speed(self):
         """Get the speed of this monster instance"""
         if self.simple_mode:
             return self.get_simple_stats().get_speed()
         else:
-            return self.get_complex_stats().get_speed()
+            return MonsterBase.stat_cache.get(type(self), self.level, StatCache.SPEED)
         
     def get_max_hp(self):
         """Get the maximum HP of this monster instance"""
         if self.simple_mode:
             return self.get_simple_stats().get_max_hp()
         else:
-            return self.get_complex_stats().get_max_hp()
+            return MonsterBase.stat_cache.get(type(self), self.level, StatCache.MAX_HP)
 
     def alive(self) -> bool:
         """Whether the current monster instance is alive (HP > 0 )"""
@@ -79,15 +95,8 @@ class MonsterBase(abc.ABC):
     def attack(self, other: MonsterBase):
         """
         Attack another monster instance
-        e is the number of elemental types in cls.instance.elements_names. in the get_effectiveness method
-        e is also the number of elements in the list of elements
-        It is not a constant as the number of elements can increase
-        All other get_ methods are O(1) as they are just returning a value
-
-        Thus when a for loop is running to loop through the element names and find the index of the element, it is O(e)
-        Best case:  O(1) is when the element is the first element in the element_names list and first element in the Element enum
-        Worst case: O(e^2) is when the element is the last element in the list as the from_string method is also O(e)
-
+        Best = Worst = O(1), both elements are already resolved by the class
+        and get_effectiveness is a single indexed read
         """
 
         dmg = 0
@@ -99,7 +108,7 @@ class MonsterBase(abc.ABC):
         else:
             dmg = self.get_attack()/4
         # Step 2 & 3: Apply type effectiveness and ceil to int
-        effectiveness = EffectivenessCalculator.get_effectiveness(Element.from_string(self.get_element()), Element.from_string(other.get_element()))
+        effectiveness = EffectivenessCalculator.get_effectiveness(self.get_element_type(), other.get_element_type())
         total_dmg = int(ceil(dmg * effectiveness))
         # Step 4: Lose HP
         other.set_hp(other.get_hp() - total_dmg)
@@ -128,6 +137,24 @@ class MonsterBase(abc.ABC):
 
             return new_monster
         
+    def get_state(self) -> tuple:
+        """
+        Returns a compact copy of this monster instance:
+        (class, simple_mode, level, original_level, current_hp)
+        """
+        return (type(self), self.simple_mode, self.level, self.original_level, self.current_hp)
+
+    @staticmethod
+    def from_state(state: tuple) -> MonsterBase:
+        """Creates a monster instance from the result of get_state, without recomputing its stats."""
+        monster_class, simple_mode, level, original_level, current_hp = state
+        monster = monster_class.__new__(monster_class)
+        monster.simple_mode = simple_mode
+        monster.level = level
+        monster.original_level = original_level
+        monster.current_hp = current_hp
+        return monster
+
     def __str__(self) -> str:
         """Returns a string when str(obj is called)"""
         return f"LV.{self.level} {self.get_name()}, {self.get_hp()}/{self.get_max_hp()} HP"
@@ -166,6 +193,22 @@ class MonsterBase(abc.ABC):
         """
         pass
 
+    @classmethod
+    def get_element_type(cls) -> Element:
+        """
+        Returns the element of the Monster as an Element.
+        The factory resolves it once per class, this fallback is O(e) like Element.from_string.
+        """
+        return Element.from_string(cls.get_element())
+
+    @classmethod
+    def get_element_bit(cls) -> int:
+        """
+        Returns the bit of the element of the Monster in a BSet of element values: 1 << (value - 1).
+        The factory precomputes it once per class.
+        """
+        return 1 << (cls.get_element_type().value - 1)
+
     @classmethod
     @abc.abstractmethod
     def can_be_spawned(cls) -> bool:
@@ -175,6 +218,14 @@ class MonsterBase(abc.ABC):
         """
         pass
 
+    @classmethod
+    def get_spawn_weight(cls) -> float:
+        """
+        Returns how likely this monster type is to be picked for a random team, relative to the
+        other spawnable types. The optional spawn_weight of monsters.yaml, 1 by default.
+        """
+        return 1
+
     @classmethod
     @abc.abstractmethod
     def get_simple_stats(cls) -> Stats:
@@ -4,6 +4,12 @@ Random number generator class. Uses LCG method with some reasonable initialisati
 __author__ = "Jackson Goerner"
 
 import time
+from typing import TYPE_CHECKING
+
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    import numpy as np
 
 class RandomGen():
     """
@@ -17,6 +23,9 @@ class RandomGen():
     RandomGen.random()           # Random number from 0 to 2^32-1
     RandomGen.randint(1, 10)     # Random number from 1 to 10
     RandomGen.random_chance(0.33) # True 33% of the time, False 67% of the time.
+    RandomGen.skip(1000)          # Same seed as calling random() 1000 times
+    RandomGen.split(4)            # Seeds of 4 non-overlapping substreams
+    RandomGen.randint_array(1, 10, 5) # NumPy array of the next 5 randint(1, 10) results
     ```
     """
 
@@ -32,6 +41,61 @@ class RandomGen():
         seed = time.time_ns() if seed is None else seed
         cls.seed = seed
 
+    @classmethod
+    def _jump_coefficients(cls, n):
+        """
+        Returns (mult, inc) such that n calls to `random` take the seed to (mult * seed + inc) % MOD.
+
+        Applying the LCG step n times is itself an LCG step with multiplier A^n and
+        increment C * (A^(n-1) + ... + A + 1), which are built by repeated squaring.
+        :complexity: O(log n)
+        """
+        if n < 0:
+            raise ValueError("Cannot jump backwards")
+        mult, inc = 1, 0
+        step_mult, step_inc = cls.A, cls.C
+        while n > 0:
+            if n & 1:
+                mult, inc = (mult * step_mult) % cls.MOD, (inc * step_mult + step_inc) % cls.MOD
+            step_mult, step_inc = (step_mult * step_mult) % cls.MOD, (step_inc * (step_mult + 1)) % cls.MOD
+            n >>= 1
+        return mult, inc
+
+    @classmethod
+    def jump(cls, seed, n):
+        """
+        Returns the seed reached from `seed` after n calls to `random`, without changing cls.seed.
+        :complexity: O(log n)
+        """
+        mult, inc = cls._jump_coefficients(n)
+        return (mult * seed + inc) % cls.MOD
+
+    @classmethod
+    def skip(cls, n):
+        """
+        Advances the seed as if `random` was called n times.
+        :complexity: O(log n)
+        """
+        cls.seed = cls.jump(cls.seed, n)
+
+    @classmethod
+    def split(cls, k, stride=None) -> ArrayR[int]:
+        """
+        Returns the seeds of k substreams starting at the current seed, `stride` calls apart.
+        By default the whole period of 2^48 is cut into k equal parts, so no two substreams overlap.
+        Use a substream with `set_seed`. cls.seed is not changed.
+        :complexity: O(k + log stride)
+        """
+        if k <= 0:
+            raise ValueError("Need at least one substream")
+        stride = cls.MOD // k if stride is None else stride
+        mult, inc = cls._jump_coefficients(stride)
+        seeds = ArrayR(k)
+        seeds[0] = cls.seed % cls.MOD
+        for i in range(1, k):
+            seeds[i] = (mult * seeds[i-1] + inc) % cls.MOD
+        return seeds
+
     @classmethod
     def random(cls):
         """Returns a random integer from 0 to 2^32-1"""
@@ -58,6 +122,53 @@ class RandomGen():
         """Returns a random choice from a collection that supports __getitem__ and __len__"""
         return collection[cls.randint(0, len(collection)-1)]
 
+    @classmethod
+    def _seed_array(cls, n) -> "np.ndarray":
+        """
+        Returns the next n seeds as a uint64 NumPy array and leaves cls.seed at the last one.
+
+        The array is filled by doubling: once the first k seeds are known, the next k are
+        the first k jumped ahead by k steps, which is one vectorised multiply-add.
+        uint64 arithmetic wraps modulo 2^64, which is a multiple of MOD, so masking to 48 bits is exact.
+        :complexity: O(n) NumPy work in O(log n) steps
+        """
+        # NumPy is only imported by the array methods, so it does not slow down importing the game
+        import numpy as np
+        seeds = np.empty(n, dtype=np.uint64)
+        if n == 0:
+            return seeds
+        mask = np.uint64(cls.MOD - 1)
+        seeds[0] = (cls.A * (cls.seed % cls.MOD) + cls.C) % cls.MOD
+        filled = 1
+        while filled < n:
+            take = min(filled, n - filled)
+            mult, inc = cls._jump_coefficients(filled)
+            seeds[filled:filled + take] = (seeds[:take] * np.uint64(mult) + np.uint64(inc)) & mask
+            filled += take
+        cls.seed = int(seeds[-1])
+        return seeds
+
+    @classmethod
+    def random_array(cls, n) -> "np.ndarray":
+        """Returns the next n results of `random` as an int64 NumPy array, advancing the seed n times."""
+        import numpy as np
+        return (cls._seed_array(n) >> np.uint64(16)).astype(np.int64)
+
+    @classmethod
+    def random_float_array(cls, n) -> "np.ndarray":
+        """Returns the next n results of `random_float` as a float64 NumPy array."""
+        return cls.random_array(n) / (1 << 32)
+
+    @classmethod
+    def randint_array(cls, lo, hi, n) -> "np.ndarray":
+        """Returns the next n results of `randint(lo, hi)` as an int64 NumPy array."""
+        return (cls.random_array(n) % (hi - lo + 1)) + lo
+
+    @classmethod
+    def random_chance_array(cls, ratio, n) -> "np.ndarray":
+        """Returns the next n results of `random_chance(ratio)` as a bool NumPy array."""
+        return cls.random_float_array(n) < ratio
+
     @classmethod
     def random_shuffle(cls, collection) -> None:
         """
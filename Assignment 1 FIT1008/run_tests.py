@@ -14,7 +14,9 @@ if __name__ == "__main__":
             "The task number you'd like to run. "
             "Leave blank for all tasks.\n\n"
             "Example: run_tests.py 3\n"
-            "Runs the tests with @number('3.x')."
+            "Runs the tests with @number('3.x').\n"
+            "Tests of the extensions beyond the tasks are numbered 'ext.N.x', "
+            "run them with run_tests.py ext, or run_tests.py ext.N for one of them."
         ),
         default="",
         nargs="?",
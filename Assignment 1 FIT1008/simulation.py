@@ -0,0 +1,129 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from battle import Battle
+from helpers import warm_up
+from random_gen import RandomGen
+from team import MonsterTeam
+
+# RandomGen calls reserved for each battle, far more than the two teams ever draw
+BATTLE_STRIDE = 1 << 20
+
+
+class MonteCarloResult:
+    """
+    Win and draw counts of a set of simulated battles, with how often the guards
+    against endless battles fired (see Battle.max_turns and Battle.detect_cycles).
+    All methods are O(1) best/worst case.
+    """
+
+    def __init__(self, team1_wins: int = 0, team2_wins: int = 0, draws: int = 0) -> None:
+        self.team1_wins = team1_wins
+        self.team2_wins = team2_wins
+        self.draws = draws
+        self.turn_caps = 0
+        self.cycles_detected = 0
+
+    def record(self, result: Battle.Result) -> None:
+        """Count the result of one battle."""
+        if result == Battle.Result.TEAM1:
+            self.team1_wins += 1
+        elif result == Battle.Result.TEAM2:
+            self.team2_wins += 1
+        else:
+            self.draws += 1
+
+    def merge(self, other: MonteCarloResult) -> None:
+        """Add the counts of another result to this one."""
+        self.team1_wins += other.team1_wins
+        self.team2_wins += other.team2_wins
+        self.draws += other.draws
+        self.turn_caps += other.turn_caps
+        self.cycles_detected += other.cycles_detected
+
+    def battles(self) -> int:
+        """The number of battles counted."""
+        return self.team1_wins + self.team2_wins + self.draws
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MonteCarloResult):
+            return False
+        return (self.team1_wins, self.team2_wins, self.draws) == (other.team1_wins, other.team2_wins, other.draws)
+
+    def __str__(self) -> str:
+        return f"Team 1: {self.team1_wins}, Team 2: {self.team2_wins}, Draws: {self.draws}"
+
+
+def run_shard(
+    seed: int,
+    start: int,
+    stop: int,
+    team_mode: MonsterTeam.TeamMode,
+    sort_key=None,
+) -> MonteCarloResult:
+    """
+    Simulate battles start to stop - 1 between two random teams, in this process.
+
+    Battle i draws its teams from the RandomGen stream of `seed`, starting BATTLE_STRIDE * i calls in,
+    which is reached with RandomGen.skip rather than by replaying the draws before it.
+    s is the number of battles, k how long a battle lasts, n the team size and m the number of monsters
+
+    Best = Worst = O(s * (log(stop * BATTLE_STRIDE) + n * m + k * (e^2 + n)))
+    """
+    result = MonteCarloResult()
+    battle = Battle(max_turns=Battle.DEFAULT_MAX_TURNS)
+    for i in range(start, stop):
+        RandomGen.set_seed(seed)
+        RandomGen.skip(BATTLE_STRIDE * i)
+        team1 = MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+        team2 = MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+        result.record(battle.battle(team1, team2))
+    result.turn_caps = battle.turn_caps
+    result.cycles_detected = battle.cycles_detected
+    return result
+
+
+def run_battles(
+    n: int,
+    seed: int,
+    workers: int | None = None,
+    team_mode: MonsterTeam.TeamMode = MonsterTeam.TeamMode.BACK,
+    sort_key=None,
+    shard_size: int | None = None,
+) -> MonteCarloResult:
+    """
+    Simulate n seeded battles between random teams over a pool of worker processes.
+
+    Each battle owns a fixed, non-overlapping slice of one RandomGen stream (see run_shard).
+    The battles are cut into contiguous shards and each worker runs whole shards,
+    so the merged counts are the same for any number of workers or shard size.
+    workers defaults to the number of CPUs, and workers=1 runs in this process.
+
+    Usage:
+    ```
+    run_battles(10000, seed=123)              # all cores
+    run_battles(10000, seed=123, workers=1)   # same counts, one process
+    ```
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        return run_shard(seed, 0, n, team_mode, sort_key)
+
+    if shard_size is None:
+        shard_size = max(1, -(-n // (workers * 4)))
+    result = MonteCarloResult()
+    # workers load the catalog and the chart before their first shard
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up) as pool:
+        futures = [
+            pool.submit(run_shard, seed, start, min(n, start + shard_size), team_mode, sort_key)
+            for start in range(0, n, shard_size)
+        ]
+        for future in futures:
+            result.merge(future.result())
+    return result
+
+
+if __name__ == "__main__":
+    print(run_battles(2000, seed=129371))
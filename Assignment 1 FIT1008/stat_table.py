@@ -0,0 +1,108 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from stats import StatCache
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from monster_base import MonsterBase
+
+
+class StatTable:
+    """
+    Attack, defense, speed and max hp of every monster class at every level, as NumPy arrays.
+
+    simple and complex both have shape (number of monster classes, max_level, 4):
+    * [i, level - 1] holds the stats of monsters[i] at that level,
+    * the last axis is indexed by StatCache.ATTACK, DEFENSE, SPEED and MAX_HP.
+
+    Simple stats do not depend on the level, so every level of a class holds the same row.
+    Class i is the i-th class of the catalog the table was built from (helpers.get_all_monsters()).
+
+    Usage:
+    ```
+    table = StatTable(helpers.get_all_monsters(), max_level=50)
+    table.gather(class_ids, levels, simple_mode=False)   # shape (len(class_ids), 4)
+    ```
+    """
+
+    DEFAULT_MAX_LEVEL = 100
+
+    def __init__(self, monsters: ArrayR[type[MonsterBase]], max_level: int = DEFAULT_MAX_LEVEL) -> None:
+        """
+        c is the number of monster classes and l the max level
+        Best = Worst = O(c * l), each complex formula is evaluated once over all l levels
+        """
+        if max_level < 1:
+            raise ValueError("max_level should be at least 1")
+        self.max_level = max_level
+        self.reload(monsters)
+
+    def reload(self, monsters: ArrayR[type[MonsterBase]]) -> None:
+        """
+        Rebuild both tables from a catalog of monster classes.
+        Best = Worst = O(c * l)
+        """
+        self.monsters = monsters
+        count = len(monsters)
+        self.simple = np.zeros((count, self.max_level, 4), dtype=np.int64)
+        self.complex = np.zeros((count, self.max_level, 4), dtype=np.int64)
+        for i in range(count):
+            self.reload_class(i)
+
+    def reload_class(self, i: int) -> None:
+        """
+        Rebuild the rows of monsters[i] only.
+        The complex formulas are evaluated once over all the levels (see ComplexStats.stats_at_levels),
+        or level by level when float64 cannot reproduce them exactly.
+        Best = Worst = O(l)
+        """
+        monster_class = self.monsters[i]
+        simple = monster_class.get_simple_stats()
+        self.simple[i, :] = (simple.get_attack(), simple.get_defense(), simple.get_speed(), simple.get_max_hp())
+
+        levels = np.arange(1, self.max_level + 1)
+        complex = monster_class.get_complex_stats()
+        try:
+            self.complex[i] = complex.stats_at_levels(levels.astype(np.float64))
+        except ArithmeticError:
+            # a value float64 cannot hold exactly, or an invalid one: level by level, as get_attack etc. do
+            for stat, function in (
+                (StatCache.ATTACK, complex.get_attack),
+                (StatCache.DEFENSE, complex.get_defense),
+                (StatCache.SPEED, complex.get_speed),
+                (StatCache.MAX_HP, complex.get_max_hp),
+            ):
+                self.complex[i, :, stat] = [function(int(level)) for level in levels]
+
+    def ensure_level(self, level: int) -> None:
+        """
+        Grow the tables, at least doubling max_level, so they cover `level`.
+        Best case: O(1) when level is already covered, Worst case: O(c * level)
+        """
+        if level <= self.max_level:
+            return
+        self.max_level = max(level, 2 * self.max_level)
+        self.reload(self.monsters)
+
+    def gather(self, class_ids: np.ndarray, levels: np.ndarray, simple_mode: bool = True) -> np.ndarray:
+        """
+        The stats of class_ids[i] at levels[i] for every i, shape (len(class_ids), 4).
+        Levels past max_level grow the table (see ensure_level), so afterwards 1 <= levels <= max_level.
+        Best = Worst = O(n) where n is len(class_ids), a single fancy-indexed read
+        (plus ensure_level if a level is past the table)
+        :raises ValueError: if a level is below 1 or a class id is not a class of the table,
+            as NumPy would otherwise read another row for negative indices
+        """
+        if len(levels) != len(class_ids):
+            raise ValueError("There should be one level per class id")
+        if len(levels) > 0:
+            if int(levels.min()) < 1:
+                raise ValueError(f"Levels should be at least 1, got {int(levels.min())}")
+            if int(class_ids.min()) < 0 or int(class_ids.max()) >= len(self.monsters):
+                raise ValueError("Class ids should be between 0 and the number of monster classes - 1")
+            self.ensure_level(int(levels.max()))
+        table = self.simple if simple_mode else self.complex
+        return table[class_ids, levels - 1]
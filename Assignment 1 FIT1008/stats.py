@@ -1,8 +1,17 @@
+from __future__ import annotations
 import abc
+import math
+import operator
+from collections import OrderedDict
+from typing import Callable, TYPE_CHECKING
 
 from data_structures.referential_array import ArrayR
 from data_structures.stack_adt import ArrayStack
-import math 
+
+if TYPE_CHECKING:
+    import numpy as np
+    from monster_base import MonsterBase
+
 class Stats(abc.ABC):
 
     @abc.abstractmethod
@@ -48,11 +57,48 @@ class SimpleStats(Stats):
     def get_max_hp(self):
         return self.max_hp
 
+
+def _level(level):
+    return level
+
+
+def _sqrt(a):
+    return int(math.sqrt(a))
+
+
+def _middle(a, b, c):
+    """The median of three values, with the same tie breaking as the original RPN evaluator."""
+    if (a <= b and b <= c) or (c <= b and b <= a):
+        return b
+    elif (b <= a and a <= c) or (c <= a and a <= b):
+        return a
+    return c
+
+
 class ComplexStats(Stats):
     """
     ComplexStats is a class that represents the complex stats of a Pokemon.
+
+    Each formula is in reverse polish notation, for example ['level', '2', '*', '3', '+'].
+    The formulas are compiled once in the constructor into functions of the level,
+    so a malformed formula is rejected when the monster catalog loads rather than mid-battle.
     """
 
+    # token -> (number of operands, function)
+    OPERATORS = {
+        "+": (2, operator.add),
+        "-": (2, operator.sub),
+        "*": (2, operator.mul),
+        "/": (2, operator.truediv),
+        "power": (2, operator.pow),
+        "sqrt": (1, _sqrt),
+        "middle": (3, _middle),
+    }
+    # OPERATORS on float64 NumPy arrays of levels, built by array_operators on first use
+    ARRAY_OPERATORS = None
+    # every integer up to this is exact in float64
+    EXACT_LIMIT = 2 ** 53
+
     def __init__(
         self,
         attack_formula: ArrayR[str],
@@ -60,74 +106,244 @@ class ComplexStats(Stats):
         speed_formula: ArrayR[str],
         max_hp_formula: ArrayR[str],
     ) -> None:
+        """
+        n is the total length of the formulas
+        Best = Worst = O(n) to compile the four formulas
+        :raises ValueError: if any formula is malformed
+        """
         self.attack_formula = attack_formula
         self.defense_formula = defense_formula
         self.speed_formula = speed_formula
         self.max_hp_formula = max_hp_formula
+        self.attack_function = self.compile_formula(attack_formula)
+        self.defense_function = self.compile_formula(defense_formula)
+        self.speed_function = self.compile_formula(speed_formula)
+        self.max_hp_function = self.compile_formula(max_hp_formula)
 
-    def _evaluate_expression(self, formula, level):
-        """
-        Evaluates a given formula with a given level.
-        Best = Worst = O(n) where n is the length of the formula as we iterate through the formula
-        The rest is all O(1) as there are only assignments and arithmetic operations which are constant time
+    @classmethod
+    def compile_formula(cls, formula: ArrayR[str], operators: dict | None = None) -> Callable[[int], int | float]:
         """
-        stack = ArrayStack(len(formula))
+        Compiles an RPN formula into a function of the level, with OPERATORS unless other
+        operators are given (such as array_operators()).
 
-        for token in formula:
+        Every stack entry is either a constant or a function of the level.
+        Operators with only constant operands are evaluated right away (constant folding),
+        so a formula which does not use the level compiles to a function returning a number.
 
-            if token == 'level':
-                stack.push(level)
-            elif token == 'power':
-                b = stack.pop()
-                a = stack.pop()
-                stack.push(a ** b)
-            elif token == 'sqrt':
-                a = stack.pop()
-                stack.push(int(math.sqrt(a)))
-            elif token == 'middle':
-                c = stack.pop()
-                b = stack.pop()
-                a = stack.pop()
-                if (a <= b and b <= c) or (c <= b and b <= a):
-                    stack.push(b)
-                elif (b <= a and a <= c) or (c <= a and a <= b):
-                    stack.push(a)
-                else:
-                    stack.push(c)
-            elif token == "+":
-                b = stack.pop()
-                a = stack.pop()
-                stack.push(a+b)
-            elif token == "-":
-                b = stack.pop()
-                a = stack.pop()
-                stack.push(a-b)
-            elif token == "*":
-                b = stack.pop()
-                a = stack.pop()
-                stack.push(a*b)
-            elif token == "/":
-                b = stack.pop()
-                a = stack.pop()
-                stack.push(a/b)
+        Best = Worst = O(n) where n is the length of the formula as every token is visited once
+        :raises ValueError: on an unknown token, a missing operand, leftover operands
+            or a constant part that cannot be evaluated (such as a division by zero)
+        """
+        operators = cls.OPERATORS if operators is None else operators
+        stack = ArrayStack(max(1, len(formula)))
+        for token in formula:
+            if token == "level":
+                stack.push((False, _level))
+            elif token in operators:
+                operands, function = operators[token]
+                if len(stack) < operands:
+                    raise ValueError(f"Malformed formula {formula}: '{token}' is missing operands")
+                args = ArrayR(operands)
+                for i in range(operands - 1, -1, -1):
+                    args[i] = stack.pop()
+                stack.push(cls._compile_operator(formula, function, args))
             else:
-                stack.push(int(token))
+                try:
+                    stack.push((True, int(token)))
+                except ValueError:
+                    raise ValueError(f"Malformed formula {formula}: unknown token '{token}'") from None
+
+        if len(stack) != 1:
+            raise ValueError(f"Malformed formula {formula}: expected one result, got {len(stack)}")
+        constant, value = stack.pop()
+        if constant:
+            return lambda level: value
+        return value
+
+    @classmethod
+    def array_operators(cls) -> dict:
+        """
+        OPERATORS for float64 NumPy arrays, with the same results as the scalar operators as long as
+        every value is exact in float64. Any value which is not (past EXACT_LIMIT, NaN or infinite)
+        raises ArithmeticError, for the caller to fall back to the scalar functions.
+        NumPy is only imported here, so it does not slow down importing the game.
+        Best = Worst = O(1)
+        """
+        if cls.ARRAY_OPERATORS is None:
+            import numpy as np
+
+            def exact(function):
+                def apply(*args):
+                    with np.errstate(all="ignore"):
+                        result = function(*args)
+                    # NaN compares False, so it is rejected too
+                    if not np.all(np.abs(result) <= cls.EXACT_LIMIT):
+                        raise ArithmeticError("Formula value not exact in float64")
+                    return result
+                return apply
+
+            def middle(a, b, c):
+                return np.where(
+                    ((a <= b) & (b <= c)) | ((c <= b) & (b <= a)), b,
+                    np.where(((b <= a) & (a <= c)) | ((c <= a) & (a <= b)), a, c),
+                )
 
-        return stack.pop()
+            cls.ARRAY_OPERATORS = {
+                "+": (2, exact(np.add)),
+                "-": (2, exact(np.subtract)),
+                "*": (2, exact(np.multiply)),
+                "/": (2, exact(np.true_divide)),
+                "power": (2, exact(np.power)),
+                "sqrt": (1, exact(lambda a: np.trunc(np.sqrt(a)))),
+                "middle": (3, exact(middle)),
+            }
+        return cls.ARRAY_OPERATORS
+
+    def stats_at_levels(self, levels: np.ndarray) -> np.ndarray:
+        """
+        The attack, defense, speed and max hp at every level of levels (a float64 NumPy array),
+        shape (len(levels), 4), like get_attack etc. but evaluating each formula once over the array.
+        The array versions of the formulas are compiled on the first call.
+        n is the total length of the formulas and l the number of levels
+        Best = Worst = O(n) NumPy operations on arrays of l levels
+        :raises ArithmeticError: if a value is not exact in float64 (see array_operators),
+            use get_attack etc. level by level then
+        """
+        import numpy as np
+        if not hasattr(self, "array_functions"):
+            operators = self.array_operators()
+            self.array_functions = tuple(
+                self.compile_formula(formula, operators)
+                for formula in (self.attack_formula, self.defense_formula, self.speed_formula, self.max_hp_formula)
+            )
+        stats = np.empty((len(levels), 4))
+        for stat, function in enumerate(self.array_functions):
+            # int() truncates towards zero, as np.trunc does
+            stats[:, stat] = np.trunc(function(levels))
+        return stats
+
+    @staticmethod
+    def _compile_operator(formula, function, args):
+        """
+        Combines the compiled operands of one operator into a new stack entry.
+        Best = Worst = O(1), there are at most three operands
+        """
+        if all(constant for constant, _ in args):
+            try:
+                return (True, function(*(value for _, value in args)))
+            except (ArithmeticError, ValueError) as e:
+                raise ValueError(f"Malformed formula {formula}: {e}") from None
+
+        if len(args) == 1:
+            a = args[0][1]
+            return (False, lambda level: function(a(level)))
+        if len(args) == 2:
+            (a_constant, a), (b_constant, b) = args[0], args[1]
+            if a_constant:
+                return (False, lambda level: function(a, b(level)))
+            if b_constant:
+                return (False, lambda level: function(a(level), b))
+            return (False, lambda level: function(a(level), b(level)))
+        functions = [value if not constant else (lambda level, value=value: value) for constant, value in args]
+        a, b, c = functions
+        return (False, lambda level: function(a(level), b(level), c(level)))
 
     """
-    All the below function has a time complexity of O(n) where n is the length of the formula as we call the _evaluate_expression function
+    All the below function has a time complexity of O(n) where n is the number of operators in the formula,
+    as each compiled operator is a single call
     """
     def get_attack(self, level: int):
-        return int(self._evaluate_expression(self.attack_formula, level))
+        return int(self.attack_function(level))
 
     def get_defense(self, level: int):
-        return int(self._evaluate_expression(self.defense_formula, level))
+        return int(self.defense_function(level))
 
     def get_speed(self, level: int):
-        return int(self._evaluate_expression(self.speed_formula, level))
+        return int(self.speed_function(level))
 
     def get_max_hp(self, level: int):
-        return int(self._evaluate_expression(self.max_hp_formula, level))
+        return int(self.max_hp_function(level))
+
+
+class StatCache:
+    """
+    Least recently used cache of complex stats, shared by all monster instances.
+
+    A complex stat only depends on the monster class and the level, so the value is
+    keyed by (monster class, level, stat) and computed from ComplexStats on a miss.
+    Once max_size entries are held, the least recently used one is evicted.
+    Simple stats do not depend on the level and are read directly, never cached.
+
+    All methods are O(1) best/worst case, apart from the formula evaluated on a miss.
+
+    Usage:
+    ```
+    cache.get(Flamikin, 5, StatCache.ATTACK)
+    cache.hits, cache.misses
+    ```
+    """
+
+    ATTACK = 0
+    DEFENSE = 1
+    SPEED = 2
+    MAX_HP = 3
+
+    DEFAULT_SIZE = 4096
+
+    def __init__(self, max_size: int = DEFAULT_SIZE) -> None:
+        if max_size <= 0:
+            raise ValueError("Cache size should be positive")
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, monster_class: type[MonsterBase], level: int, stat: int) -> int:
+        """Returns the complex stat of monster_class at level, computing it on a miss."""
+        key = (monster_class, level, stat)
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            value = self._compute(monster_class.get_complex_stats(), level, stat)
+            self.entries[key] = value
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    @classmethod
+    def _compute(cls, stats: ComplexStats, level: int, stat: int) -> int:
+        if stat == cls.ATTACK:
+            return stats.get_attack(level)
+        elif stat == cls.DEFENSE:
+            return stats.get_defense(level)
+        elif stat == cls.SPEED:
+            return stats.get_speed(level)
+        elif stat == cls.MAX_HP:
+            return stats.get_max_hp(level)
+        raise ValueError(f"Unknown stat {stat}")
+
+    def invalidate(self, monster_class: type[MonsterBase]) -> int:
+        """
+        Drops the entries of one monster class, for example after it was reloaded, and returns how many.
+        Best = Worst = O(s) for the s entries held
+        """
+        stale = [key for key in self.entries if key[0] is monster_class]
+        for key in stale:
+            del self.entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drops every entry and resets the counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
 
+    def __len__(self) -> int:
+        return len(self.entries)
 
+    def __str__(self) -> str:
+        return f"StatCache({len(self)}/{self.max_size} entries, {self.hits} hits, {self.misses} misses)"
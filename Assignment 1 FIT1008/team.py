@@ -4,13 +4,15 @@ from typing import Optional, TYPE_CHECKING
 
 from base_enum import BaseEnum
 from monster_base import MonsterBase
+from elements import Element
 from random_gen import RandomGen
-from helpers import get_all_monsters
+from helpers import get_all_monsters, get_catalog_version, get_spawn_table
 from data_structures.stack_adt import ArrayStack
 from data_structures.queue_adt import CircularQueue
 from data_structures.sorted_list_adt import ListItem 
 from data_structures.array_sorted_list import ArraySortedList
 from data_structures.referential_array import ArrayR
+from data_structures.bset import BSet
 
 if TYPE_CHECKING:
     from battle import Battle
@@ -47,12 +49,22 @@ class MonsterTeam:
         """
         # Add any preinit logic here.
         self.team_mode = team_mode
+        # how many monsters of each element are in the team, indexed by element value - 1,
+        # and the bitmask of the elements with a non zero count (bit value - 1, like BSet),
+        # as of catalog version elements_version (a reload can change the element of a class).
+        # Adding and retrieving keep counting after a reload, elements() recounts when it is stale.
+        self.element_counts = ArrayR(len(Element))
+        self.element_mask = 0
+        self.elements_version = 0
+        self._clear_elements()
         # creating team and original team based on teammode
         self.arr = self.recreate_team()
         self.original_team = self.recreate_team()
 
         # depending on sort key use lambda function to get the key
         self.sort_key = kwargs['sort_key'] if 'sort_key' in kwargs else None
+        # keep the sort mode itself, the key is replaced by a lambda below
+        self.sort_mode = self.sort_key
         if self.sort_key == self.SortMode.HP:
             self.sort_key = lambda monster: monster.get_hp()
         elif self.sort_key == self.SortMode.ATTACK:
@@ -77,7 +89,7 @@ class MonsterTeam:
         
     def add_to_team(self, monster: MonsterBase):
         """
-        Add a monster to the team.
+        Add a monster to the team, and count its element in the element mask in O(1).
         Best case = Worst case = O(1) as the push and push methods are O(1) for TeamMode.FRONT 
         Best case = Worst case = O(1) as the append and serve methods are O(1) for TeamMode.BACK
         
@@ -86,6 +98,7 @@ class MonsterTeam:
         Best case:  O(log n) as the add method is O(log n) where the list item is to be added to the back of the team
         Worst case: O(n) as the add method is O(n) where the list item is to be added to the front of the team
         """
+        self._count_element(monster, 1)
         if self.team_mode == MonsterTeam.TeamMode.FRONT:
             self.arr.push(monster)
         elif self.team_mode == MonsterTeam.TeamMode.BACK:
@@ -101,7 +114,7 @@ class MonsterTeam:
 
     def retrieve_from_team(self) -> MonsterBase:
         """
-        Retrieve a monster from the team.
+        Retrieve a monster from the team, and uncount its element in the element mask in O(1).
         Best case = Worst case = O(1) as the pop and serve methods are O(1) for TeamMode.FRONT and TeamMode.BACK respectively.
 
         TeamMode.OPTIMISE:
@@ -109,13 +122,71 @@ class MonsterTeam:
         Best case = Worst case =  O(1) as the delete_at_index method is O(1) where the list item is to be deleted back of the team because it doesn't have to be shuffled
         """
         if self.team_mode == MonsterTeam.TeamMode.FRONT:
-            return self.arr.pop()
+            monster = self.arr.pop()
         elif self.team_mode == MonsterTeam.TeamMode.BACK:
-            return self.arr.serve()
+            monster = self.arr.serve()
         elif self.team_mode == MonsterTeam.TeamMode.OPTIMISE:
             # return the monster instead of list_item
-            monster = self.arr.delete_at_index(len(self)-1)
-            return monster.value
+            monster = self.arr.delete_at_index(len(self)-1).value
+        self._count_element(monster, -1)
+        return monster
+
+    def _count_element(self, monster: MonsterBase | type[MonsterBase], change: int) -> None:
+        """
+        Add change to the count of the element of monster (or monster class), and update its bit in the element mask.
+        Once a catalog reload made the counts stale they may go wrong (even negative), which does not
+        matter as _check_elements recounts them before they are read.
+        Best case = Worst case = O(1)
+        """
+        index = monster.get_element_type().value - 1
+        count = self.element_counts[index] + change
+        self.element_counts[index] = count
+        if count == 0:
+            self.element_mask &= ~monster.get_element_bit()
+        else:
+            self.element_mask |= monster.get_element_bit()
+
+    def _clear_elements(self) -> None:
+        """
+        Count no monsters of any element.
+        e is the number of elements
+        Best case = Worst case = O(e)
+        """
+        for i in range(len(self.element_counts)):
+            self.element_counts[i] = 0
+        self.element_mask = 0
+        self.elements_version = get_catalog_version()
+
+    def _check_elements(self) -> None:
+        """
+        Recount the elements of the team if a catalog reload changed monster classes since they were counted,
+        as the element of a class may have changed. Only the readers of the counts call this, so adding and
+        retrieving monsters do not pay for the version check.
+        Best case: O(1) when the counts are up to date
+        Worst case: O(n + e) to recount n monsters
+        """
+        if self.elements_version == get_catalog_version():
+            return
+        self._clear_elements()
+        if self.team_mode == MonsterTeam.TeamMode.FRONT:
+            for i in range(len(self.arr)):
+                self._count_element(self.arr.array[i], 1)
+        elif self.team_mode == MonsterTeam.TeamMode.BACK:
+            size = len(self.arr.array)
+            for i in range(len(self.arr)):
+                self._count_element(self.arr.array[(self.arr.front + i) % size], 1)
+        elif self.team_mode == MonsterTeam.TeamMode.OPTIMISE:
+            for i in range(len(self.arr)):
+                self._count_element(self.arr[i].value, 1)
+
+    def elements(self) -> BSet:
+        """
+        The elements of the monsters in the team, as a BSet of element values.
+        Best case: O(1) as the element mask is kept up to date
+        Worst case: O(n + e) when a catalog reload means the team has to be recounted
+        """
+        self._check_elements()
+        return BSet.from_bits(self.element_mask)
 
     def special(self) -> None:
         """
@@ -194,123 +265,87 @@ class MonsterTeam:
 
     def regenerate_team(self) -> None:
         """
-        For TeamMode.FRONT: 
-        The first 3 monsters at the front are reversed (Up to the current capacity of the team)
-        Best case = Worst case = O(n)  where n is the number of items in the list (self) because we assume that the team limit can be increased.
-        This is because Circular queue based on TEAM_LIMIT is created
+        Put the team back to how it was created, in place.
+        The monsters of original_team are reset (see MonsterBase.reset) and put back into the
+        cleared team container in their original order, so no monster or container is allocated
+        (only the ListItems of original_team in TeamMode.OPTIMISE).
+        original_team and the team share the same monster instances afterwards, original_team is
+        only read here and reset restores whatever a battle did to them.
+        n is the number of monsters in the original team
 
-        For TeamMode.BACK:
-        The first half of the team is swapped with the second half (in an odd team size, the middle monster is in the bottom half), 
-        The original second half of the team is reversed.
-        Best case = Worst case = O(n)  where n is the number of items in the list (self) because we assume that the team limit can be increased.
-        This is because Circular queue and Array Stack based on TEAM_LIMIT is created
-    
+        TeamMode.FRONT and TeamMode.BACK:
+        Best case = Worst case = O(n) as every monster is reset and pushed or appended once
 
-        For TeamMode.OPTIMISE:
-        The original ascending list is changed to descending order based on the sort key
-        Best case = Worst case = O(n)  where n is the number of items in the list (self) because we assume that the team limit can be increased.
-        This is because Array Sorted List based on TEAM_LIMIT is created
-        delete_at_index is still O(1) because no shuffling when deleted from the back of the list
+        TeamMode.OPTIMISE:
+        The items are taken from the back of original_team and added to the team with the key of the
+        reset monster, then new items with the same monsters and keys are added back to original_team
+        from the back of the team, so special never changes the keys of original_team.
+        As when the team was first built, add decides where monsters with equal keys go.
+        Best case:  O(n log n) where every item is added to the back of the lists
+        Worst case: O(n^2) where every item is added to the front of the lists, due to shuffling
+
+        The element counts are recounted from the original monsters, which adds O(e) for e elements.
         """
+        self.arr.clear()
+        self._clear_elements()
         if self.team_mode == MonsterTeam.TeamMode.FRONT:
-            # create temporary stack to store monsters
-            temp_stack = ArrayStack(MonsterTeam.TEAM_LIMIT)
-            new_stack = ArrayStack(MonsterTeam.TEAM_LIMIT)
-            # loop based on original team size
-            for _ in range(len(self.original_team)):
-                # get the tyoe
-                monster_class = type(self.original_team.pop())
-                temp_stack.push(monster_class())
-
-            for _ in range(len(temp_stack)):
-                monster = temp_stack.pop()
-                # store it back to new stack 
-                new_stack.push(monster)
-                # store it back to original team
-                self.original_team.push(monster)
+            for i in range(len(self.original_team)):
+                monster = self.original_team.array[i]
+                monster.reset()
+                self._count_element(monster, 1)
+                self.arr.push(monster)
 
-            # reference new stack to self.arr
-            self.arr = new_stack
-        
         elif self.team_mode == MonsterTeam.TeamMode.BACK:
-            # create temporary queue to store monsters
-            temp_queue = CircularQueue(MonsterTeam.TEAM_LIMIT)
-            new_queue = CircularQueue(MonsterTeam.TEAM_LIMIT)
-            for _ in range(len(self.original_team)):
-                monster_class = type(self.original_team.serve())
-                temp_queue.append(monster_class())
-                new_queue.append(monster_class())
-            
-            for _ in range(len(temp_queue)):
-                monster = temp_queue.serve()
-                self.original_team.append(monster)
+            size = len(self.original_team.array)
+            for i in range(len(self.original_team)):
+                monster = self.original_team.array[(self.original_team.front + i) % size]
+                monster.reset()
+                self._count_element(monster, 1)
+                self.arr.append(monster)
 
-            self.arr = new_queue
-        
         elif self.team_mode == MonsterTeam.TeamMode.OPTIMISE:
-            # create temporary sorted list to store monsters
-            temp_sorted_lst = ArraySortedList(MonsterTeam.TEAM_LIMIT)
-            new_sorted_lst = ArraySortedList(MonsterTeam.TEAM_LIMIT)
-            for _ in range(len(self.original_team)):
-                monster_class = type((self.original_team.delete_at_index(len(self.original_team) -1)).value)
-                list_item = ListItem(monster_class(), self.sort_key(monster_class()))
-                new_sorted_lst.add(list_item)
-                temp_sorted_lst.add(list_item)
-            
-            for _ in range(len(temp_sorted_lst)):
-                monster = temp_sorted_lst.delete_at_index(len(temp_sorted_lst) -1)
-                self.original_team.add(monster)
-            
-            self.arr = new_sorted_lst
+            while not self.original_team.is_empty():
+                list_item = self.original_team.delete_at_index(len(self.original_team) - 1)
+                list_item.value.reset()
+                self._count_element(list_item.value, 1)
+                # special may have negated the key, this is the key of a new monster
+                list_item.key = self.sort_key(list_item.value)
+                self.arr.add(list_item)
+            # new items, so special negating the keys of the team leaves original_team sorted
+            for i in range(len(self.arr) - 1, -1, -1):
+                self.original_team.add(ListItem(self.arr[i].value, self.arr[i].key))
 
     def select_randomly(self, sort_key=None):
         """
         Generate a team randomly.
         The team size should be between 1 and TEAM_LIMIT (inclusive).
         The monsters should be selected from the list of all monsters that can be spawned.
-        Note:
-        For my assumption, i assume that for the best case, it is possible for me to Generate 1 for team size as it is random and it finds the spawnable monster first try.
+        Each monster is drawn from helpers.get_spawn_table() in O(1), weighted by spawn_weight.
+        Without weights (or with equal ones) a pick is the single randint of a scan of
+        get_all_monsters() for the n-th spawnable monster, so seeded teams stay the same.
         n is the size of the team but it can be increased thus it is not constant
-        m is the total amount of monster which also can be increased thus it is not a constant
-        k is the complexity of get_all_monsters()
-        
+
         TeamMode.FRONT and TeamMode.BACK:
-        Best case:  O(k) as the random generates 1 for team size and it finds the spawnable monster first try
-        Worst case: O(k + n * m) where the team size chosen is the maximum the spawnable monster is the last monster in the list
-        where O(k + n + m*n) is simplified to O(k + n * m)
+        Best case:  O(1) as the random generates 1 for team size
+        Worst case: O(n) where the team size chosen is the maximum, as every pick is O(1)
 
         TeamMode.OPTIMISE:
-        Best case:  O(k) as the random generates 1 for team size and it finds the spawnable monster first try
-        Worst case: O(k * n^2 * m) where the loop run for the range of team size, where within the loop,
-        The for loop runs for the range of all monsters. Then, add to team for optimise will be O(n) when the monster is added to the front of the list.
+        Best case:  O(1) as the random generates 1 for team size
+        Worst case: O(n^2) where the loop run for the range of team size, and add to team for optimise
+        will be O(n) when the monster is added to the front of the list.
         """
         # Randomly generate team in between 1, and maximum team limit
         team_size = RandomGen.randint(1, self.TEAM_LIMIT)
-        # Get all monsters
-        monsters = get_all_monsters()
-        n_spawnable = 0
-
-        # Count the number of spawnable monsters
-        for x in range(len(monsters)):
-            if monsters[x].can_be_spawned():
-                n_spawnable += 1
+        spawn_table = get_spawn_table()
+        if spawn_table is None:
+            raise ValueError("Spawning logic failed.")
 
         # For each monster in the team, randomly select a monster from the list of spawnable monsters
         for _ in range(team_size):
-            # Randomly select a monster
-            spawner_index = RandomGen.randint(0, n_spawnable-1)
-            cur_index = -1
-            for x in range(len(monsters)):
-                if monsters[x].can_be_spawned():
-                    cur_index += 1
-                    if cur_index == spawner_index:
-                        # add the monster to team and original team
-                        self.add_to_team(monsters[x]())
-                        self.add_to_original_team(monsters[x]())
-
-                        break
-            else:
-                raise ValueError("Spawning logic failed.")
+            monster_class = spawn_table.sample(RandomGen)
+            # add the monster to team and original team
+            self.add_to_team(monster_class())
+            self.add_to_original_team(monster_class())
     
 
     def select_manually(self, sort_key=None):
@@ -500,6 +535,60 @@ class MonsterTeam:
             self.original_team.add(list_item)
 
     
+    def snapshot(self) -> tuple:
+        """
+        Returns a compact copy of the team and the original team: the state of every monster
+        (see MonsterBase.get_state) in container order, with its sort key in TeamMode.OPTIMISE.
+        Best = Worst = O(n) where n is the number of monsters in the team
+        """
+        return (self._container_state(self.arr), self._container_state(self.original_team))
+
+    def state_key(self) -> tuple:
+        """
+        The monsters left in the team, in container order, as a hashable tuple (see snapshot).
+        Best = Worst = O(n) where n is the number of monsters in the team
+        """
+        return self._container_state(self.arr)
+
+    def restore(self, state: tuple) -> None:
+        """
+        Replaces the team and the original team with new containers built from a snapshot,
+        and recounts the elements of the team.
+        Best = Worst = O(n + e), the monsters are added back in order, so the sorted list never shuffles
+        """
+        self.arr = self._rebuild_container(state[0])
+        self.original_team = self._rebuild_container(state[1])
+        self._clear_elements()
+        for monster_state in state[0]:
+            if self.team_mode == MonsterTeam.TeamMode.OPTIMISE:
+                monster_state = monster_state[0]
+            # the class of the monster is enough to count its element
+            self._count_element(monster_state[0], 1)
+
+    def _container_state(self, container) -> tuple:
+        """The states of the monsters of a container, from the first to be stored to the last."""
+        if self.team_mode == MonsterTeam.TeamMode.FRONT:
+            return tuple(container.array[i].get_state() for i in range(len(container)))
+        elif self.team_mode == MonsterTeam.TeamMode.BACK:
+            size = len(container.array)
+            return tuple(container.array[(container.front + i) % size].get_state() for i in range(len(container)))
+        elif self.team_mode == MonsterTeam.TeamMode.OPTIMISE:
+            return tuple((container[i].value.get_state(), container[i].key) for i in range(len(container)))
+
+    def _rebuild_container(self, states: tuple):
+        """A new container holding new monsters made from states, in the same order."""
+        container = self.recreate_team()
+        for state in states:
+            if self.team_mode == MonsterTeam.TeamMode.FRONT:
+                container.push(MonsterBase.from_state(state))
+            elif self.team_mode == MonsterTeam.TeamMode.BACK:
+                container.append(MonsterBase.from_state(state))
+            elif self.team_mode == MonsterTeam.TeamMode.OPTIMISE:
+                # keys arrive in ascending order, append keeps the order of equal keys
+                monster_state, key = state
+                container.append(ListItem(MonsterBase.from_state(monster_state), key))
+        return container
+
     def __str__(self):
         """
         printing the team
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from array import array
+from typing import TYPE_CHECKING
+
+from random_gen import RandomGen
+from team import MonsterTeam
+from helpers import get_catalog_version, get_spawn_table
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from monster_base import MonsterBase
+
+
+class TeamColumns:
+    """
+    Many random teams stored as flat arrays instead of MonsterTeam objects.
+
+    Team i has sizes[i] monsters, whose classes are monsters[class_ids[i * team_limit + j]]
+    for j in range(sizes[i]), in the order select_randomly would have added them, and lives[i] lives.
+    element_masks[i] is the bitmask of the elements of team i, like MonsterTeam.element_mask.
+    monsters is the spawnable catalog the teams were drawn from, kept so a later catalog reload
+    does not change which classes existing teams hold. A reload can still change those classes
+    themselves (their stats, element or can_be_spawned): materialize uses the classes as they are,
+    and spawnability is not checked again. element_masks is a snapshot taken by generate,
+    read it through element_mask, which recomputes a team's mask once a reload changed classes.
+    A team costs about 2 * team_limit + 12 bytes, and only
+    becomes a MonsterTeam (with its containers and monster instances) when materialize is called.
+
+    Usage:
+    ```
+    columns = TeamColumns.generate(10 ** 6, min_lives=2, max_lives=10)
+    team = columns.materialize(0)
+    ```
+    """
+
+    SIZE_TYPECODE = "B"
+    CLASS_ID_TYPECODE = "H"
+    LIVES_TYPECODE = "H"
+    MAX_LIVES = 2 ** 16 - 1
+    ELEMENT_MASK_TYPECODE = "L"
+
+    def __init__(
+        self,
+        monsters: ArrayR[type[MonsterBase]],
+        team_mode: MonsterTeam.TeamMode = MonsterTeam.TeamMode.BACK,
+        sort_key: MonsterTeam.SortMode | None = None,
+        team_limit: int = MonsterTeam.TEAM_LIMIT,
+    ) -> None:
+        """
+        No teams yet, see generate.
+        Best = Worst = O(1)
+        """
+        self.monsters = monsters
+        self.team_mode = team_mode
+        self.sort_key = sort_key
+        self.team_limit = team_limit
+        self.sizes = array(self.SIZE_TYPECODE)
+        self.class_ids = array(self.CLASS_ID_TYPECODE)
+        self.lives = array(self.LIVES_TYPECODE)
+        self.element_masks = array(self.ELEMENT_MASK_TYPECODE)
+        # the catalog version element_masks was computed at
+        self.elements_version = get_catalog_version()
+
+    @classmethod
+    def generate(
+        cls,
+        n: int,
+        min_lives: int,
+        max_lives: int,
+        team_mode: MonsterTeam.TeamMode = MonsterTeam.TeamMode.BACK,
+        sort_key: MonsterTeam.SortMode | None = None,
+    ) -> TeamColumns:
+        """
+        Generate n random teams with min_lives to max_lives lives each, drawing the same random
+        numbers as n times MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+        each followed by RandomGen.randint(min_lives, max_lives), so a seeded tower gets the same teams.
+        n is the number of teams and t the team limit
+        Best = Worst = O(n * t), the arrays are allocated once and every pick is O(1)
+        Every team gets at least one life, a team without lives would already be dead.
+        :raises ValueError: if the lives are not within 1 and TeamColumns.MAX_LIVES, or min_lives > max_lives.
+        """
+        if not 1 <= min_lives <= max_lives <= cls.MAX_LIVES:
+            raise ValueError(f"Lives should be within 1 and {cls.MAX_LIVES}, got {min_lives} to {max_lives}")
+        spawn_table = get_spawn_table()
+        if spawn_table is None:
+            raise ValueError("Spawning logic failed.")
+        columns = cls(spawn_table.items, team_mode, sort_key)
+        team_limit = columns.team_limit
+        sizes = columns.sizes = array(cls.SIZE_TYPECODE, bytes(n))
+        class_ids = columns.class_ids = array(cls.CLASS_ID_TYPECODE, bytes(2 * n * team_limit))
+        lives = columns.lives = array(cls.LIVES_TYPECODE, bytes(2 * n))
+        element_masks = columns.element_masks = array(cls.ELEMENT_MASK_TYPECODE, [0]) * n
+        monsters = columns.monsters
+        for i in range(n):
+            size = RandomGen.randint(1, team_limit)
+            sizes[i] = size
+            start = i * team_limit
+            mask = 0
+            for j in range(start, start + size):
+                class_id = spawn_table.sample_index(RandomGen)
+                class_ids[j] = class_id
+                mask |= monsters[class_id].get_element_bit()
+            element_masks[i] = mask
+            lives[i] = RandomGen.randint(min_lives, max_lives)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def monster_classes(self, i: int) -> ArrayR[type[MonsterBase]]:
+        """
+        The monster classes of team i, in the order they are added to the team.
+        Best = Worst = O(t)
+        """
+        start = i * self.team_limit
+        classes = ArrayR(self.sizes[i])
+        for j in range(len(classes)):
+            classes[j] = self.monsters[self.class_ids[start + j]]
+        return classes
+
+    def element_mask(self, i: int) -> int:
+        """
+        The bitmask of the elements of team i, like MonsterTeam.element_mask.
+        Best case: O(1) from element_masks
+        Worst case: O(t) from the classes of the team, when a reload changed classes since generate
+        """
+        if self.elements_version == get_catalog_version():
+            return self.element_masks[i]
+        mask = 0
+        start = i * self.team_limit
+        for j in range(start, start + self.sizes[i]):
+            mask |= self.monsters[self.class_ids[j]].get_element_bit()
+        return mask
+
+    def materialize(self, i: int) -> MonsterTeam:
+        """
+        A new MonsterTeam holding new monsters of team i, the same team select_randomly would have built.
+        The monsters are added like select_provided does, but without checking that their classes
+        can still be spawned: the team was valid when it was generated. Draws no random numbers.
+        Best = Worst = O(t) in TeamMode.FRONT and TeamMode.BACK, see select_provided for TeamMode.OPTIMISE
+        """
+        team = MonsterTeam(self.team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR(0), sort_key=self.sort_key)
+        classes = self.monster_classes(i)
+        for j in range(len(classes)):
+            team.add_to_team(classes[j]())
+            team.add_to_original_team(classes[j]())
+        return team
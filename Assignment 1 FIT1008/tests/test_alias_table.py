@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from random_gen import RandomGen
+from data_structures.alias_table import AliasTable
+from data_structures.referential_array import ArrayR
+
+
+class FixedDraws:
+    """A random source returning given numbers, to check which column and coin a draw uses."""
+
+    def __init__(self, column: int, coin: float) -> None:
+        self.column = column
+        self.coin = coin
+
+    def randint(self, low: int, high: int) -> int:
+        return self.column
+
+    def random_float(self) -> float:
+        return self.coin
+
+
+class TestAliasTable(TestCase):
+
+    @number("ext.22.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_distribution_follows_weights(self):
+        weights = [1, 2, 3, 0, 4]
+        table = AliasTable(ArrayR.from_list(list("abcde")), ArrayR.from_list(weights))
+        RandomGen.set_seed(1)
+        draws = 50000
+        counts = {item: 0 for item in "abcde"}
+        for _ in range(draws):
+            counts[table.sample(RandomGen)] += 1
+        self.assertEqual(counts["d"], 0)
+        for item, weight in zip("abcde", weights):
+            self.assertAlmostEqual(counts[item] / draws, weight / sum(weights), delta=0.01)
+
+    @number("ext.22.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_uniform_table_is_one_randint(self):
+        table = AliasTable(ArrayR.from_list(list("abcd")), ArrayR.from_list([2, 2, 2, 2]))
+        RandomGen.set_seed(8)
+        drawn = [table.sample_index(RandomGen) for _ in range(100)]
+        RandomGen.set_seed(8)
+        self.assertEqual(drawn, [RandomGen.randint(0, 3) for _ in range(100)])
+
+    @number("ext.22.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_columns_use_the_given_random_source(self):
+        table = AliasTable(ArrayR.from_list(list("ab")), ArrayR.from_list([1, 3]))
+        # column 0 keeps "a" half of the time and gives "b" otherwise
+        self.assertEqual(table.prob[0], 0.5)
+        self.assertEqual(table.sample(FixedDraws(0, 0.25)), "a")
+        self.assertEqual(table.sample(FixedDraws(0, 0.75)), "b")
+        self.assertEqual(table.sample(FixedDraws(1, 0.99)), "b")
+        with self.assertRaises(ValueError):
+            AliasTable(ArrayR.from_list(list("ab")), ArrayR.from_list([0, 0]))
+        with self.assertRaises(ValueError):
+            AliasTable(ArrayR.from_list(list("ab")), ArrayR.from_list([1, -1]))
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from batch_battle import BatchBattle
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from data_structures.referential_array import ArrayR
+
+
+MODES = [(MonsterTeam.TeamMode.FRONT, None), (MonsterTeam.TeamMode.BACK, None)] + [
+    (MonsterTeam.TeamMode.OPTIMISE, sort_key) for sort_key in MonsterTeam.SortMode
+]
+
+
+class TestBatchBattle(TestCase):
+
+    @number("ext.1.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_batch_matches_scalar_battles(self):
+        pairs = 4 * len(MODES) * len(MODES)
+        teams1 = ArrayR(pairs)
+        teams2 = ArrayR(pairs)
+        RandomGen.set_seed(4321)
+        for i in range(pairs):
+            mode1 = MODES[i % len(MODES)]
+            mode2 = MODES[(i // len(MODES)) % len(MODES)]
+            teams1[i] = MonsterTeam(mode1[0], MonsterTeam.SelectionMode.RANDOM, sort_key=mode1[1])
+            teams2[i] = MonsterTeam(mode2[0], MonsterTeam.SelectionMode.RANDOM, sort_key=mode2[1])
+            # some teams start reordered, as they would after a special
+            if i % 3 == 0:
+                teams1[i].special()
+        before = [(teams1[i].snapshot(), teams2[i].snapshot()) for i in range(pairs)]
+
+        results = BatchBattle().battle(teams1, teams2)
+        self.assertEqual(len(results), pairs)
+        # the teams are only read
+        self.assertEqual([(teams1[i].snapshot(), teams2[i].snapshot()) for i in range(pairs)], before)
+
+        battle = Battle()
+        for i in range(pairs):
+            self.assertEqual(results[i], battle.battle(teams1[i], teams2[i]), f"pair {i}")
+
+    @number("ext.1.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_mismatched_sides(self):
+        with self.assertRaises(ValueError):
+            BatchBattle().battle(ArrayR(2), ArrayR(3))
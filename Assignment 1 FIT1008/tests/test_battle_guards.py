@@ -0,0 +1,93 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+import helpers
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from data_structures.referential_array import ArrayR
+
+
+def random_teams(seed: int) -> tuple:
+    RandomGen.set_seed(seed)
+    return (
+        MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM),
+        MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.RANDOM),
+    )
+
+
+class SwappingTeam(MonsterTeam):
+    """
+    A team which heals the monster it has out and swaps it, every turn.
+    Between two of them nobody attacks and the chip damage is healed, so the battle repeats forever.
+    """
+
+    def choose_action(self, currently_out, enemy) -> Battle.Action:
+        currently_out.set_hp(currently_out.get_max_hp())
+        return Battle.Action.SWAP
+
+
+def swapping_team(*monsters) -> SwappingTeam:
+    return SwappingTeam(
+        MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list(list(monsters)),
+    )
+
+
+class TestBattleGuards(TestCase):
+
+    @number("ext.14.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_no_cap_by_default(self):
+        uncapped = Battle()
+        self.assertIsNone(uncapped.max_turns)
+        self.assertFalse(uncapped.detect_cycles)
+        capped = Battle(max_turns=Battle.DEFAULT_MAX_TURNS)
+        for seed in range(30):
+            self.assertEqual(uncapped.battle(*random_teams(seed)), capped.battle(*random_teams(seed)))
+        self.assertEqual(capped.turn_caps, 0)
+
+    @number("ext.14.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_cap_ends_with_stalled_result(self):
+        battle = Battle(max_turns=1, stalled_result=Battle.Result.TEAM2)
+        self.assertEqual(battle.battle(*random_teams(3)), Battle.Result.TEAM2)
+        self.assertEqual(battle.turn_number, 1)
+        self.assertEqual(battle.turn_caps, 1)
+        with self.assertRaises(ValueError):
+            Battle(max_turns=0)
+
+    @number("ext.14.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_detect_cycles_stops_a_repeating_battle(self):
+        battle = Battle(detect_cycles=True, stalled_result=Battle.Result.TEAM1)
+        team1 = swapping_team(helpers.Flamikin, helpers.Aquariuma)
+        team2 = swapping_team(helpers.Vineon, helpers.Thundrake, helpers.Strikeon)
+        self.assertEqual(battle.battle(team1, team2), Battle.Result.TEAM1)
+        self.assertEqual(battle.cycles_detected, 1)
+        self.assertEqual(battle.turn_caps, 0)
+        # both teams go round every 6 turns, the state after turn 7 is the one after turn 1
+        self.assertEqual(battle.turn_number, 7)
+        first = battle.state_key()
+
+        self.assertEqual(battle.battle(swapping_team(helpers.Flamikin), swapping_team(helpers.Vineon)), Battle.Result.TEAM1)
+        self.assertEqual(battle.cycles_detected, 2)
+        self.assertNotEqual(battle.state_key(), first)
+
+    @number("ext.14.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_without_detect_cycles_only_the_cap_stops_it(self):
+        battle = Battle(max_turns=50)
+        self.assertEqual(
+            battle.battle(swapping_team(helpers.Flamikin, helpers.Aquariuma), swapping_team(helpers.Vineon)),
+            Battle.Result.DRAW,
+        )
+        self.assertEqual(battle.turn_number, 50)
+        self.assertEqual((battle.turn_caps, battle.cycles_detected), (1, 0))
+
+        # battles which end by themselves are not changed by detect_cycles
+        watching = Battle(detect_cycles=True)
+        default = Battle()
+        for seed in range(30):
+            self.assertEqual(watching.battle(*random_teams(seed)), default.battle(*random_teams(seed)))
+        self.assertEqual(watching.cycles_detected, 0)
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+import battle_log
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+
+
+def random_team() -> MonsterTeam:
+    return MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
+
+
+class TestBattleLog(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "battles.log")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    @number("ext.9.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_index_finds_every_turn(self):
+        RandomGen.set_seed(17)
+        results = []
+        with battle_log.BattleLogWriter(self.path) as log:
+            battle = Battle(log=log)
+            for _ in range(20):
+                results.append(battle.battle(random_team(), random_team()))
+
+        records = list(battle_log.read_records(self.path))
+        written = battle_log.BattleLogIndex(self.path)
+        # without its .idx file, the index is rebuilt by scanning the log
+        os.remove(battle_log.index_path(self.path))
+        scanned = battle_log.BattleLogIndex(self.path)
+        self.assertEqual(scanned.index, written.index)
+        for index in (written, scanned):
+            self.assertEqual(len(index), 20)
+            start = 0
+            for battle_id in range(20):
+                turns = index.turns(battle_id)
+                expected = records[start:start + turns]
+                self.assertEqual(list(index.battle_records(battle_id)), expected)
+                self.assertEqual(index.read_turn(battle_id, turns), expected[-1])
+                self.assertEqual([record.turn for record in expected], list(range(1, turns + 1)))
+                self.assertTrue(all(record.battle == battle_id for record in expected))
+                self.assertEqual(expected[-1].result, results[battle_id].value)
+                start += turns
+            self.assertEqual(start, len(records))
+            with self.assertRaises(IndexError):
+                index.read_turn(0, index.turns(0) + 1)
+
+    @number("ext.9.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_stalled_battle_ends_with_a_record(self):
+        RandomGen.set_seed(17)
+        with battle_log.BattleLogWriter(self.path) as log:
+            result = Battle(log=log, max_turns=2, stalled_result=Battle.Result.DRAW).battle(random_team(), random_team())
+        self.assertEqual(result, Battle.Result.DRAW)
+        records = list(battle_log.read_records(self.path))
+        self.assertEqual([record.turn for record in records], [1, 2, 3])
+        self.assertEqual([record.result for record in records], [0, 0, Battle.Result.DRAW.value])
+        self.assertEqual(records[-1].flags, battle_log.STALLED)
+        self.assertEqual((records[-1].action1, records[-1].action2), (0, 0))
+        self.assertEqual(battle_log.BattleLogIndex(self.path).turns(0), 3)
@@ -0,0 +1,43 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from battle_service import BattleService, run_batch, run_request
+
+
+class TestBattleService(TestCase):
+
+    @number("ext.13.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_malformed_requests_are_answered_alone(self):
+        good = {"seed": 3, "team1": {"mode": "BACK"}, "team2": {"mode": "FRONT"}}
+        answers = run_batch([
+            good,
+            {"seed": 3, "team1": {"monsters": []}, "team2": {"mode": "BACK"}},
+            {"seed": 3, "team1": 5, "team2": {"mode": "BACK"}},
+            good,
+        ])
+        self.assertIn("result", answers[0])
+        self.assertIn("error", answers[1])
+        self.assertIn("error", answers[2])
+        self.assertEqual(answers[3], answers[0])
+        self.assertEqual(answers[0], run_request(good))
+
+    @number("ext.13.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_close_fails_queued_requests(self):
+        async def scenario():
+            service = BattleService(workers=1, executor=ThreadPoolExecutor(1))
+            await service.start()
+            # never dispatched, so only close can resolve it
+            service.dispatcher.cancel()
+            future = await service.enqueue({"seed": 1, "team1": {}, "team2": {}})
+            await service.close()
+            service.executor.shutdown()
+            return future
+
+        future = asyncio.run(scenario())
+        self.assertTrue(future.done())
+        self.assertIsInstance(future.exception(), RuntimeError)
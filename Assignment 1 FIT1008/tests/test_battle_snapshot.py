@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+import battle_log
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.sorted_list_adt import ListItem
+
+
+MODES = [
+    (MonsterTeam.TeamMode.FRONT, None),
+    (MonsterTeam.TeamMode.BACK, None),
+    (MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SortMode.HP),
+    (MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SortMode.LEVEL),
+]
+
+
+def start_battle(seed: int, mode1: tuple, mode2: tuple) -> Battle:
+    """A battle between two random teams, stopped before its first turn."""
+    RandomGen.set_seed(seed)
+    team1 = MonsterTeam(mode1[0], MonsterTeam.SelectionMode.RANDOM, sort_key=mode1[1])
+    team2 = MonsterTeam(mode2[0], MonsterTeam.SelectionMode.RANDOM, sort_key=mode2[1])
+    battle = Battle()
+    battle.turn_number = 0
+    battle.team1 = team1
+    battle.team2 = team2
+    battle.out1 = team1.retrieve_from_team()
+    battle.out2 = team2.retrieve_from_team()
+    return battle
+
+
+class TestBattleSnapshot(TestCase):
+
+    @number("ext.10.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_resumed_snapshot_matches_the_uninterrupted_battle(self):
+        for seed in range(10):
+            for mode1 in MODES:
+                for mode2 in MODES:
+                    uninterrupted = start_battle(seed, mode1, mode2)
+                    expected = uninterrupted.resume()
+                    expected_state = uninterrupted.state_key()
+
+                    battle = start_battle(seed, mode1, mode2)
+                    result = None
+                    for _ in range(3):
+                        battle.turn_number += 1
+                        result = battle.process_turn()
+                        if result is not None:
+                            break
+                    if result is not None:
+                        continue
+                    snapshot = battle.snapshot()
+                    # the same snapshot can be resumed again after the battle ended
+                    for _ in range(2):
+                        self.assertEqual(battle.resume(snapshot), expected)
+                        self.assertEqual(battle.state_key(), expected_state)
+                        self.assertEqual(battle.turn_number, uninterrupted.turn_number)
+
+    @number("ext.10.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_append_keeps_equal_keys_in_order(self):
+        items = ArraySortedList(1)
+        for value, key in [("a", 1), ("b", 2), ("c", 2), ("d", 2), ("e", 5)]:
+            items.append(ListItem(value, key))
+        self.assertEqual([items[i].value for i in range(len(items))], ["a", "b", "c", "d", "e"])
+        with self.assertRaises(IndexError):
+            items.append(ListItem("f", 4))
+        self.assertEqual(len(items), 5)
+
+    @number("ext.10.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_resume_into_a_logging_battle(self):
+        directory = tempfile.mkdtemp()
+        resumed_battles = 0
+        try:
+            for seed in range(20):
+                mode1, mode2 = MODES[seed % len(MODES)], MODES[(seed + 1) % len(MODES)]
+                uninterrupted_path = os.path.join(directory, f"uninterrupted{seed}.log")
+                resumed_path = os.path.join(directory, f"resumed{seed}.log")
+
+                RandomGen.set_seed(seed)
+                team1 = MonsterTeam(mode1[0], MonsterTeam.SelectionMode.RANDOM, sort_key=mode1[1])
+                team2 = MonsterTeam(mode2[0], MonsterTeam.SelectionMode.RANDOM, sort_key=mode2[1])
+                with battle_log.BattleLogWriter(uninterrupted_path) as log:
+                    expected = Battle(log=log).battle(team1, team2)
+
+                battle = start_battle(seed, mode1, mode2)
+                result = None
+                while result is None and battle.turn_number < 2:
+                    battle.turn_number += 1
+                    result = battle.process_turn()
+                if result is not None:
+                    continue
+                resumed_battles += 1
+                snapshot = battle.snapshot()
+                with battle_log.BattleLogWriter(resumed_path) as log:
+                    logging = Battle(log=log)
+                    self.assertEqual(logging.resume(snapshot), expected)
+                    # every resume is a battle of its own in the log
+                    self.assertEqual(logging.resume(snapshot), expected)
+
+                turns = [record._replace(battle=0) for record in battle_log.read_records(uninterrupted_path)]
+                index = battle_log.BattleLogIndex(resumed_path)
+                self.assertEqual(len(index), 2)
+                for battle_id in range(2):
+                    resumed = [record._replace(battle=0) for record in index.battle_records(battle_id)]
+                    self.assertEqual(resumed, turns[2:])
+        finally:
+            shutil.rmtree(directory)
+        self.assertGreater(resumed_battles, 5)
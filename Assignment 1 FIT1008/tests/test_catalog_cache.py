@@ -0,0 +1,92 @@
+import marshal
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+import helpers
+
+
+class TestCatalogCache(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "monsters.yaml")
+        self.cache_path = helpers.catalog_cache_path(self.path)
+        self.environ = os.environ.pop(helpers.CATALOG_CACHE_ENV, None)
+        self.write("- name: Alpha\n  level: 1\n", mtime_ns=1_000_000_000)
+
+    def tearDown(self) -> None:
+        os.environ.pop(helpers.CATALOG_CACHE_ENV, None)
+        if self.environ is not None:
+            os.environ[helpers.CATALOG_CACHE_ENV] = self.environ
+        shutil.rmtree(self.directory)
+
+    def write(self, text: str, mtime_ns: int) -> None:
+        with open(self.path, "w") as f:
+            f.write(text)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def forge_cache(self, catalog: list) -> None:
+        """A cache which is fresh for the current file but holds `catalog`, to tell when it is used."""
+        helpers._write_catalog_cache(self.cache_path, os.stat(self.path), helpers._file_digest(self.path), catalog)
+
+    def cached(self) -> tuple:
+        with open(self.cache_path, "rb") as f:
+            return marshal.load(f)
+
+    @number("ext.17.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_fresh_cache_is_used(self):
+        self.assertEqual(helpers.load_catalog(self.path), [{"name": "Alpha", "level": 1}])
+        self.assertEqual(self.cached()[-1], [{"name": "Alpha", "level": 1}])
+        self.forge_cache(["from the cache"])
+        self.assertEqual(helpers.load_catalog(self.path), ["from the cache"])
+
+    @number("ext.17.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_edit_of_the_same_size_is_parsed(self):
+        helpers.load_catalog(self.path)
+        size = os.path.getsize(self.path)
+        self.write("- name: Omega\n  level: 9\n", mtime_ns=2_000_000_000)
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(helpers.load_catalog(self.path), [{"name": "Omega", "level": 9}])
+        version, cached_size, mtime_ns, digest, catalog = self.cached()
+        self.assertEqual((mtime_ns, digest), (2_000_000_000, helpers._file_digest(self.path)))
+        self.assertEqual(catalog, [{"name": "Omega", "level": 9}])
+
+    @number("ext.17.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_touch_keeps_the_cache(self):
+        self.forge_cache(["from the cache"])
+        os.utime(self.path, ns=(3_000_000_000, 3_000_000_000))
+        self.assertEqual(helpers.load_catalog(self.path), ["from the cache"])
+        # the cache now carries the new mtime, so the next load does not hash the file
+        self.assertEqual(self.cached()[2], 3_000_000_000)
+        self.assertEqual(self.cached()[-1], ["from the cache"])
+
+    @number("ext.17.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_corrupt_cache_falls_back_to_the_yaml(self):
+        self.forge_cache(["from the cache"])
+        with open(self.cache_path, "rb") as f:
+            valid = f.read()
+        for damaged in (valid[:len(valid) // 2], b"", b"not marshal data", marshal.dumps(7), marshal.dumps((1, 2))):
+            with open(self.cache_path, "wb") as f:
+                f.write(damaged)
+            self.assertEqual(helpers.load_catalog(self.path), [{"name": "Alpha", "level": 1}])
+            # and the cache is written again
+            self.assertEqual(self.cached()[-1], [{"name": "Alpha", "level": 1}])
+
+    @number("ext.17.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_environment_turns_the_cache_off(self):
+        self.forge_cache(["from the cache"])
+        os.environ[helpers.CATALOG_CACHE_ENV] = "off"
+        self.assertEqual(helpers.load_catalog(self.path), [{"name": "Alpha", "level": 1}])
+        self.assertEqual(self.cached()[-1], ["from the cache"])
+        os.remove(self.cache_path)
+        helpers.load_catalog(self.path)
+        self.assertFalse(os.path.exists(self.cache_path))
@@ -0,0 +1,109 @@
+import math
+import operator
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+import helpers
+from stats import ComplexStats
+from data_structures.referential_array import ArrayR
+
+
+def interpret(formula, level):
+    """The RPN evaluator ComplexStats used before formulas were compiled, token by token."""
+    stack = []
+    for token in formula:
+        if token == "level":
+            stack.append(level)
+        elif token == "power":
+            b, a = stack.pop(), stack.pop()
+            stack.append(a ** b)
+        elif token == "sqrt":
+            stack.append(int(math.sqrt(stack.pop())))
+        elif token == "middle":
+            c, b, a = stack.pop(), stack.pop(), stack.pop()
+            if (a <= b and b <= c) or (c <= b and b <= a):
+                stack.append(b)
+            elif (b <= a and a <= c) or (c <= a and a <= b):
+                stack.append(a)
+            else:
+                stack.append(c)
+        elif token == "+":
+            b, a = stack.pop(), stack.pop()
+            stack.append(a + b)
+        elif token == "-":
+            b, a = stack.pop(), stack.pop()
+            stack.append(a - b)
+        elif token == "*":
+            b, a = stack.pop(), stack.pop()
+            stack.append(a * b)
+        elif token == "/":
+            b, a = stack.pop(), stack.pop()
+            stack.append(a / b)
+        else:
+            stack.append(int(token))
+    return stack.pop()
+
+
+def formula(*tokens) -> ArrayR:
+    return ArrayR.from_list(list(tokens))
+
+
+class TestComplexStats(TestCase):
+
+    @number("ext.6.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_compiled_formulas_match_the_interpreter(self):
+        formulas = [
+            formula("level", "2", "*", "3", "+"),
+            formula("level", "3", "/", "2", "power"),
+            formula("100", "level", "sqrt", "-"),
+            formula("level", "7", "20", "middle"),
+            formula("50", "5", "level", "level", "*", "12", "middle", "-"),
+            formula("2", "3", "power", "level", "+"),
+            formula("9"),
+        ]
+        monsters = helpers.get_all_monsters()
+        for i in range(len(monsters)):
+            stats = monsters[i].get_complex_stats()
+            formulas.extend([stats.attack_formula, stats.defense_formula, stats.speed_formula, stats.max_hp_formula])
+        for rpn in formulas:
+            compiled = ComplexStats.compile_formula(rpn)
+            for level in range(1, 101):
+                self.assertEqual(compiled(level), interpret(rpn, level), f"{list(rpn)} at level {level}")
+
+    @number("ext.6.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_constant_parts_are_folded(self):
+        folded = ComplexStats._compile_operator(
+            formula(), operator.mul, ArrayR.from_list([(True, 6), (True, 7)]),
+        )
+        self.assertEqual(folded, (True, 42))
+        constant, function = ComplexStats._compile_operator(
+            formula(), operator.add, ArrayR.from_list([(True, 6), (False, lambda level: level)]),
+        )
+        self.assertFalse(constant)
+        self.assertEqual(function(4), 10)
+        # a formula without the level is a single number, whatever the level
+        compiled = ComplexStats.compile_formula(formula("2", "3", "power", "4", "sqrt", "+"))
+        self.assertEqual([compiled(level) for level in (1, 50, 1000)], [10, 10, 10])
+        # constant parts are evaluated when compiling
+        with self.assertRaises(ValueError):
+            ComplexStats.compile_formula(formula("1", "0", "/", "level", "+"))
+
+    @number("ext.6.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_malformed_formulas_are_rejected(self):
+        malformed = [
+            formula("level", "+"),
+            formula("middle"),
+            formula("level", "2"),
+            formula("level", "2", "%"),
+            formula("levle"),
+            formula(),
+        ]
+        for rpn in malformed:
+            with self.assertRaises(ValueError, msg=str(list(rpn))):
+                ComplexStats.compile_formula(rpn)
+        with self.assertRaises(ValueError):
+            ComplexStats(formula("1"), formula("1"), formula("level", "level"), formula("1"))
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from elements import Element, EffectivenessCalculator
+
+
+def multipliers(calculator: EffectivenessCalculator) -> list:
+    """Every attacker/defender multiplier of a calculator, in Element order, None for missing pairs."""
+    values = []
+    for i in range(len(Element) * len(Element)):
+        value = calculator.matrix[i]
+        values.append(None if value is None or value != value else value)
+    return values
+
+
+class TestEffectivenessBinary(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.directory, "type_effectiveness.csv")
+        self.binary_path = os.path.join(self.directory, "type_effectiveness.bin")
+        shutil.copyfile(EffectivenessCalculator.CSV_PATH, self.csv_path)
+        self.instance = EffectivenessCalculator.instance
+
+    def tearDown(self) -> None:
+        EffectivenessCalculator.instance = self.instance
+        shutil.rmtree(self.directory)
+
+    def edit(self, attacker: str, defender: str, value: float, mtime_ns: int) -> None:
+        """Change one multiplier of the CSV copy, giving it a new mtime."""
+        with open(self.csv_path) as f:
+            lines = f.read().strip().split("\n")
+        names = lines[0].split(",")
+        row = lines[1 + names.index(attacker)].split(",")
+        row[names.index(defender)] = str(value)
+        lines[1 + names.index(attacker)] = ",".join(row)
+        with open(self.csv_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.utime(self.csv_path, ns=(mtime_ns, mtime_ns))
+
+    @number("ext.18.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_mapped_chart_matches_the_csv(self):
+        parsed = EffectivenessCalculator.load(self.csv_path, self.binary_path)
+        self.assertFalse(hasattr(parsed, "mapped"))
+        mapped = EffectivenessCalculator.load(self.csv_path, self.binary_path)
+        self.assertTrue(hasattr(mapped, "mapped"))
+        self.assertEqual(multipliers(mapped), multipliers(parsed))
+        self.assertEqual(multipliers(mapped), multipliers(EffectivenessCalculator.from_csv(self.csv_path)))
+
+        EffectivenessCalculator.instance = mapped
+        self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.FIRE, Element.WATER), 0.5)
+        self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.NORMAL, Element.GHOST), 0)
+
+    @number("ext.18.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_stale_binary_is_rebuilt_from_the_csv(self):
+        EffectivenessCalculator.load(self.csv_path, self.binary_path)
+        self.edit("Fire", "Water", 4, mtime_ns=5_000_000_000)
+        self.assertIsNone(EffectivenessCalculator.from_binary(self.binary_path, self.csv_path))
+        # without the CSV to compare with, the old binary is still readable
+        self.assertIsNotNone(EffectivenessCalculator.from_binary(self.binary_path))
+
+        loaded = EffectivenessCalculator.load(self.csv_path, self.binary_path)
+        self.assertEqual(loaded.matrix[(Element.FIRE.value - 1) * len(Element) + Element.WATER.value - 1], 4)
+        mapped = EffectivenessCalculator.from_binary(self.binary_path, self.csv_path)
+        self.assertIsNotNone(mapped)
+        self.assertEqual(multipliers(mapped), multipliers(loaded))
+
+    @number("ext.18.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_binary_of_the_wrong_length_is_ignored(self):
+        EffectivenessCalculator.load(self.csv_path, self.binary_path)
+        with open(self.binary_path, "rb") as f:
+            valid = f.read()
+        for damaged in (valid[:-8], valid + b"\0" * 8, valid[:EffectivenessCalculator.BINARY_HEADER.size], b""):
+            with open(self.binary_path, "wb") as f:
+                f.write(damaged)
+            self.assertIsNone(EffectivenessCalculator.from_binary(self.binary_path, self.csv_path))
+            loaded = EffectivenessCalculator.load(self.csv_path, self.binary_path)
+            self.assertEqual(multipliers(loaded), multipliers(EffectivenessCalculator.from_csv(self.csv_path)))
+            self.assertEqual(os.path.getsize(self.binary_path), len(valid))
+        os.remove(self.binary_path)
+        self.assertIsNone(EffectivenessCalculator.from_binary(self.binary_path, self.csv_path))
+
+    @number("ext.18.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_reload_returns_the_changed_rows(self):
+        EffectivenessCalculator.instance = EffectivenessCalculator.load(self.csv_path, self.binary_path)
+        unchanged = EffectivenessCalculator.reload(self.csv_path, self.binary_path)
+        self.assertEqual(len(unchanged), 0)
+
+        self.edit("Fire", "Water", 4, mtime_ns=6_000_000_000)
+        self.edit("Ghost", "Normal", 1, mtime_ns=6_000_000_000)
+        changed = EffectivenessCalculator.reload(self.csv_path, self.binary_path)
+        self.assertEqual([changed[i] for i in range(len(changed))], [Element.FIRE, Element.GHOST])
+        self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.FIRE, Element.WATER), 4)
+        self.assertEqual(EffectivenessCalculator.get_effectiveness(Element.GHOST, Element.NORMAL), 1)
+        # the new singleton is a mapping of the rewritten binary
+        self.assertTrue(hasattr(EffectivenessCalculator.instance, "mapped"))
+        self.assertIsNotNone(EffectivenessCalculator.from_binary(self.binary_path, self.csv_path))
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import yaml
+
+from ed_utils.decorators import number, visibility
+
+import helpers
+from hot_reload import HotReloader, ReloadEvent
+
+
+class TestHotReload(TestCase):
+
+    def setUp(self) -> None:
+        helpers.get_all_monsters()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "monsters.yaml")
+        with open(helpers.MONSTERS_PATH) as f:
+            self.catalog = yaml.safe_load(f)
+
+    def tearDown(self) -> None:
+        helpers.reload_monsters(helpers.MONSTERS_PATH)
+        shutil.rmtree(self.directory)
+
+    def write(self, catalog: list) -> None:
+        with open(self.path, "w") as f:
+            yaml.safe_dump(catalog, f)
+
+    def entry(self, name: str) -> dict:
+        return next(monster for monster in self.catalog if monster["name"] == name)
+
+    @number("ext.19.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_reload_changes_only_edited_classes(self):
+        flamikin = helpers.Flamikin
+        self.entry("Flamikin")["description"] = "CHANGED"
+        self.write(self.catalog)
+        changed, structural = helpers.reload_monsters(self.path)
+        self.assertEqual([changed[i] for i in range(len(changed))], [flamikin])
+        self.assertFalse(structural)
+        self.assertIs(helpers.Flamikin, flamikin)
+        self.assertEqual(flamikin.get_description(), "CHANGED")
+
+    @number("ext.19.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_invalid_reload_changes_nothing(self):
+        description = helpers.Flamikin.get_description()
+        spawn_table = helpers.get_spawn_table()
+        self.entry("Flamikin")["description"] = "CHANGED"
+        self.catalog[-1]["element"] = "Bogus"
+        self.write(self.catalog)
+        with self.assertRaises(ValueError):
+            helpers.reload_monsters(self.path)
+        self.assertEqual(helpers.Flamikin.get_description(), description)
+        self.assertIs(helpers.get_spawn_table(), spawn_table)
+
+    @number("ext.19.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_reloader_reports_changes_and_errors(self):
+        self.write(self.catalog)
+        errors = []
+        events = []
+        reloader = HotReloader(monsters_path=self.path, chart_path=self.path + ".missing", on_error=errors.append)
+        reloader.add_listener(events.append)
+        self.assertEqual(len(reloader.check()), 0)
+
+        self.entry("Flamikin")["description"] = "CHANGED"
+        self.write(self.catalog)
+        # make sure the stamp changes even on coarse mtime clocks
+        os.utime(self.path, ns=(0, 1))
+        reloader.check()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].kind, ReloadEvent.MONSTERS)
+
+        self.catalog[-1]["element"] = "Bogus"
+        self.write(self.catalog)
+        os.utime(self.path, ns=(0, 2))
+        reloader.check()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(events), 1)
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+# the directory holding helpers.py, which the subprocesses import from
+SOURCE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code: str) -> str:
+    """Run code in a fresh interpreter, where nothing has been imported yet, and return its output."""
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=SOURCE_DIRECTORY, capture_output=True, text=True, timeout=120,
+    )
+    if completed.returncode != 0:
+        raise AssertionError(completed.stderr)
+    return completed.stdout.strip()
+
+
+class TestLazyCatalog(TestCase):
+
+    @number("ext.20.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_import_does_not_build_the_catalog(self):
+        output = run_python(
+            "import helpers\n"
+            "from elements import EffectivenessCalculator\n"
+            "print(helpers._monsters is None, helpers._stat_table is None, 'Flamikin' in vars(helpers),\n"
+            "      EffectivenessCalculator.instance is None)\n"
+            "flamikin = helpers.Flamikin\n"
+            "print(helpers._monsters is not None, vars(helpers)['Flamikin'] is flamikin, helpers._stat_table is None)\n"
+        )
+        self.assertEqual(output.split("\n"), ["True True False True", "True True True"])
+
+    @number("ext.20.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_warm_up_loads_once(self):
+        output = run_python(
+            "import threading\n"
+            "import helpers\n"
+            "from elements import EffectivenessCalculator\n"
+            "loads = []\n"
+            "load_catalog = helpers.load_catalog\n"
+            "helpers.load_catalog = lambda *args: loads.append(1) or load_catalog(*args)\n"
+            "threads = [threading.Thread(target=helpers.warm_up, kwargs={'stat_table': True}) for _ in range(8)]\n"
+            "for thread in threads: thread.start()\n"
+            "for thread in threads: thread.join()\n"
+            "built = (helpers.get_all_monsters(), helpers.get_stat_table(), EffectivenessCalculator.instance)\n"
+            "helpers.warm_up(stat_table=True)\n"
+            "again = (helpers.get_all_monsters(), helpers.get_stat_table(), EffectivenessCalculator.instance)\n"
+            "print(len(loads), all(a is b for a, b in zip(built, again)), len(built[0]) > 0)\n"
+        )
+        self.assertEqual(output, "1 True True")
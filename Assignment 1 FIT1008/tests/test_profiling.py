@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+import battle_log
+import profiling
+from battle import Battle
+from profiling import PhaseProfiler
+from random_gen import RandomGen
+from team import MonsterTeam
+
+
+def random_team() -> MonsterTeam:
+    return MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
+
+
+class TestProfiling(TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        profiling.disable()
+        shutil.rmtree(self.directory)
+
+    def assertHistogramsMatchCounts(self, profiler: PhaseProfiler) -> None:
+        for phase in range(len(PhaseProfiler.PHASES)):
+            self.assertEqual(sum(profiler.histograms[phase]), profiler.counts[phase])
+        for name, phase in profiler.report().items():
+            self.assertEqual(sum(phase["histogram"].values()), phase["count"], name)
+
+    @number("ext.11.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_every_phase_is_timed_once_per_turn(self):
+        RandomGen.set_seed(11)
+        profiler = profiling.enable()
+        laps = []
+        profiler.add_hook(lambda phase, elapsed: laps.append(phase))
+        turns = 0
+        for _ in range(30):
+            battle = Battle()
+            battle.battle(random_team(), random_team())
+            turns += battle.turn_number
+        self.assertGreater(turns, 30)
+        for phase in range(len(PhaseProfiler.PHASES)):
+            self.assertEqual(profiler.counts[phase], 0 if phase == PhaseProfiler.LOG else turns)
+        self.assertEqual(len(laps), sum(profiler.counts))
+        self.assertHistogramsMatchCounts(profiler)
+        # the phases of a turn are lapped in order
+        self.assertEqual(laps[:PhaseProfiler.LOG], list(range(PhaseProfiler.LOG)))
+
+    @number("ext.11.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_logging_is_its_own_phase(self):
+        RandomGen.set_seed(12)
+        profiler = PhaseProfiler()
+        turns = 0
+        with battle_log.BattleLogWriter(os.path.join(self.directory, "battles.log")) as log:
+            for _ in range(30):
+                battle = Battle(log=log, profiler=profiler)
+                battle.battle(random_team(), random_team())
+                turns += battle.turn_number
+        self.assertEqual(profiler.counts, [turns] * len(PhaseProfiler.PHASES))
+        self.assertHistogramsMatchCounts(profiler)
+
+        merged = PhaseProfiler()
+        merged.merge(profiler)
+        merged.merge(profiler)
+        self.assertEqual(merged.counts, [2 * turns] * len(PhaseProfiler.PHASES))
+        self.assertHistogramsMatchCounts(merged)
@@ -0,0 +1,71 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from random_gen import RandomGen
+
+
+def stepped(seed: int, n: int) -> int:
+    """The seed after n calls to RandomGen.random, one at a time."""
+    RandomGen.set_seed(seed)
+    for _ in range(n):
+        RandomGen.random()
+    return RandomGen.seed
+
+
+class TestRandomGen(TestCase):
+
+    @number("ext.3.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_jump_and_skip_match_stepping(self):
+        for seed in (0, 1, 123456789, RandomGen.MOD - 1):
+            for n in (0, 1, 2, 3, 7, 64, 1000, 4097):
+                expected = stepped(seed, n)
+                self.assertEqual(RandomGen.jump(seed, n), expected)
+                RandomGen.set_seed(seed)
+                RandomGen.skip(n)
+                self.assertEqual(RandomGen.seed, expected)
+        # the period is the whole modulus
+        self.assertEqual(RandomGen.jump(42, RandomGen.MOD), 42)
+        with self.assertRaises(ValueError):
+            RandomGen.jump(1, -1)
+
+    @number("ext.3.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_split_matches_stepping(self):
+        RandomGen.set_seed(99)
+        seeds = RandomGen.split(5, stride=300)
+        self.assertEqual(RandomGen.seed, 99)
+        for i in range(len(seeds)):
+            self.assertEqual(seeds[i], stepped(99, 300 * i))
+
+        RandomGen.set_seed(99)
+        seeds = RandomGen.split(4)
+        for i in range(len(seeds)):
+            self.assertEqual(seeds[i], RandomGen.jump(99, i * RandomGen.MOD // 4))
+        # the substreams continue exactly where the previous one ends
+        self.assertEqual(RandomGen.jump(seeds[3], RandomGen.MOD // 4), seeds[0])
+        with self.assertRaises(ValueError):
+            RandomGen.split(0)
+
+    @number("ext.4.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_arrays_match_scalar_draws(self):
+        draws = [
+            (RandomGen.random_array, RandomGen.random, ()),
+            (RandomGen.random_float_array, RandomGen.random_float, ()),
+            (RandomGen.randint_array, RandomGen.randint, (3, 17)),
+            (RandomGen.random_chance_array, RandomGen.random_chance, (0.3,)),
+        ]
+        for array_draw, scalar_draw, args in draws:
+            for n in (0, 1, 2, 5, 64, 1000):
+                RandomGen.set_seed(2024)
+                expected = [scalar_draw(*args) for _ in range(n)]
+                seed = RandomGen.seed
+
+                RandomGen.set_seed(2024)
+                drawn = array_draw(*args, n)
+                self.assertEqual(drawn.shape, (n,))
+                self.assertEqual(drawn.tolist(), expected)
+                # the stream carries on where the scalar draws would have left it
+                self.assertEqual(RandomGen.seed, seed)
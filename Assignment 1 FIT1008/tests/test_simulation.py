@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from battle import Battle
+from random_gen import RandomGen
+from simulation import BATTLE_STRIDE, MonteCarloResult, run_battles, run_shard
+from team import MonsterTeam
+
+
+class TestSimulation(TestCase):
+
+    @number("ext.2.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_same_counts_for_any_number_of_workers(self):
+        for team_mode, sort_key in (
+            (MonsterTeam.TeamMode.BACK, None),
+            (MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SortMode.HP),
+        ):
+            alone = run_battles(60, seed=31, workers=1, team_mode=team_mode, sort_key=sort_key)
+            self.assertEqual(alone.battles(), 60)
+            pooled = run_battles(60, seed=31, workers=3, team_mode=team_mode, sort_key=sort_key)
+            self.assertEqual(pooled, alone)
+            self.assertEqual((pooled.turn_caps, pooled.cycles_detected), (alone.turn_caps, alone.cycles_detected))
+            uneven = run_battles(60, seed=31, workers=3, team_mode=team_mode, sort_key=sort_key, shard_size=7)
+            self.assertEqual(uneven, alone)
+
+    @number("ext.2.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_shard_boundaries_keep_each_battle(self):
+        seed, n = 8, 24
+        # battle i starts BATTLE_STRIDE * i draws into the stream, like substream i of a split
+        RandomGen.set_seed(seed)
+        streams = RandomGen.split(n, stride=BATTLE_STRIDE)
+        merged = MonteCarloResult()
+        for i in range(n):
+            single = run_shard(seed, i, i + 1, MonsterTeam.TeamMode.BACK)
+            merged.merge(single)
+
+            RandomGen.set_seed(streams[i])
+            team1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
+            team2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
+            expected = MonteCarloResult()
+            expected.record(Battle(max_turns=Battle.DEFAULT_MAX_TURNS).battle(team1, team2))
+            self.assertEqual(single, expected, f"battle {i}")
+
+        self.assertEqual(merged, run_shard(seed, 0, n, MonsterTeam.TeamMode.BACK))
+        for boundary in (1, 5, 13, 23):
+            split = run_shard(seed, 0, boundary, MonsterTeam.TeamMode.BACK)
+            split.merge(run_shard(seed, boundary, n, MonsterTeam.TeamMode.BACK))
+            self.assertEqual(split, merged)
@@ -0,0 +1,92 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+import helpers
+from monster_base import MonsterBase
+from stats import ComplexStats, StatCache
+from data_structures.referential_array import ArrayR
+
+
+class Counted:
+    """A stand-in monster class whose complex attack is `attack` at every level."""
+    attack = 10
+
+    @classmethod
+    def get_complex_stats(cls) -> ComplexStats:
+        constant = ArrayR.from_list([str(cls.attack)])
+        return ComplexStats(constant, constant, constant, constant)
+
+
+class TestStatCache(TestCase):
+
+    def setUp(self) -> None:
+        Counted.attack = 10
+
+    @number("ext.7.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_least_recently_used_is_evicted(self):
+        cache = StatCache(max_size=3)
+        for level in (1, 2, 3):
+            cache.get(helpers.Flamikin, level, StatCache.ATTACK)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 3, 3))
+        # level 1 becomes the most recently used, so level 2 is the one to go
+        cache.get(helpers.Flamikin, 1, StatCache.ATTACK)
+        cache.get(helpers.Flamikin, 4, StatCache.ATTACK)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(
+            list(cache.entries), [(helpers.Flamikin, level, StatCache.ATTACK) for level in (3, 1, 4)],
+        )
+        cache.get(helpers.Flamikin, 2, StatCache.ATTACK)
+        self.assertEqual((cache.hits, cache.misses), (1, 5))
+        with self.assertRaises(ValueError):
+            StatCache(max_size=0)
+
+    @number("ext.7.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_values_match_the_formulas(self):
+        cache = StatCache(max_size=64)
+        monsters = helpers.get_all_monsters()
+        for i in range(len(monsters)):
+            stats = monsters[i].get_complex_stats()
+            for level in (1, 5, 5, 30):
+                self.assertEqual(cache.get(monsters[i], level, StatCache.ATTACK), stats.get_attack(level))
+                self.assertEqual(cache.get(monsters[i], level, StatCache.DEFENSE), stats.get_defense(level))
+                self.assertEqual(cache.get(monsters[i], level, StatCache.SPEED), stats.get_speed(level))
+                self.assertEqual(cache.get(monsters[i], level, StatCache.MAX_HP), stats.get_max_hp(level))
+        self.assertEqual(cache.hits, 4 * len(monsters))
+        self.assertEqual(cache.misses, 12 * len(monsters))
+        with self.assertRaises(ValueError):
+            cache.get(helpers.Flamikin, 1, 4)
+
+    @number("ext.7.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_invalidate_and_clear(self):
+        cache = StatCache()
+        self.assertEqual(cache.get(Counted, 1, StatCache.ATTACK), 10)
+        cache.get(Counted, 2, StatCache.ATTACK)
+        cache.get(helpers.Flamikin, 2, StatCache.ATTACK)
+        Counted.attack = 20
+        # still the old value until the class is invalidated
+        self.assertEqual(cache.get(Counted, 1, StatCache.ATTACK), 10)
+        self.assertEqual(cache.invalidate(Counted), 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(Counted, 1, StatCache.ATTACK), 20)
+        self.assertEqual(cache.invalidate(Counted), 1)
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+        self.assertEqual(cache.get(Counted, 1, StatCache.ATTACK), 20)
+
+    @number("ext.7.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_monsters_share_the_class_cache(self):
+        self.assertIsInstance(MonsterBase.stat_cache, StatCache)
+        MonsterBase.stat_cache.clear()
+        first = helpers.Flamikin(simple_mode=False, level=3)
+        second = helpers.Flamikin(simple_mode=False, level=3)
+        self.assertEqual(first.get_attack(), helpers.Flamikin.get_complex_stats().get_attack(3))
+        misses = MonsterBase.stat_cache.misses
+        self.assertEqual(second.get_attack(), first.get_attack())
+        self.assertEqual(MonsterBase.stat_cache.misses, misses)
+        self.assertGreaterEqual(MonsterBase.stat_cache.hits, 1)
@@ -0,0 +1,101 @@
+from unittest import TestCase
+
+import numpy as np
+
+from ed_utils.decorators import number, visibility
+
+import helpers
+from data_structures.referential_array import ArrayR
+from monster_base import MonsterBase
+from stat_table import StatTable
+from stats import ComplexStats, SimpleStats, StatCache
+
+
+def formula_class(*formulas: str) -> type:
+    """A stand-in monster class with the complex formulas (attack, defense, speed, max hp) given in RPN."""
+    complex = ComplexStats(*(ArrayR.from_list(formula.split()) for formula in formulas))
+
+    class FormulaMonster:
+        @classmethod
+        def get_simple_stats(cls):
+            return SimpleStats(1, 1, 1, 1)
+
+        @classmethod
+        def get_complex_stats(cls):
+            return complex
+
+    return FormulaMonster
+
+
+class TestStatTable(TestCase):
+
+    @number("ext.8.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_gather_matches_monster_stats(self):
+        monsters = helpers.get_all_monsters()
+        table = StatTable(monsters, max_level=4)
+        class_ids = np.array([i for i in range(len(monsters)) for _ in range(3)])
+        levels = np.array([level for _ in range(len(monsters)) for level in (1, 4, 9)])
+        for simple_mode in (True, False):
+            stats = table.gather(class_ids, levels, simple_mode=simple_mode)
+            for row in range(len(class_ids)):
+                monster = monsters[int(class_ids[row])](simple_mode=simple_mode, level=int(levels[row]))
+                expected = [monster.get_attack(), monster.get_defense(), monster.get_speed(), monster.get_max_hp()]
+                self.assertEqual(list(stats[row]), expected)
+        # level 9 was past the table, so it grew
+        self.assertGreaterEqual(table.max_level, 9)
+
+    @number("ext.8.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_gather_rejects_indices_outside_the_table(self):
+        monsters = helpers.get_all_monsters()
+        table = StatTable(monsters, max_level=4)
+        with self.assertRaises(ValueError):
+            table.gather(np.array([0, 1]), np.array([1, 0]))
+        with self.assertRaises(ValueError):
+            table.gather(np.array([-1]), np.array([1]))
+        with self.assertRaises(ValueError):
+            table.gather(np.array([len(monsters)]), np.array([1]))
+        with self.assertRaises(ValueError):
+            table.gather(np.array([0, 1]), np.array([1]))
+        self.assertEqual(table.gather(np.array([], dtype=int), np.array([], dtype=int)).shape, (0, 4))
+
+    @number("ext.8.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_gather_matches_stat_cache_at_every_level(self):
+        monsters = helpers.get_all_monsters()
+        table = StatTable(monsters)
+        class_ids = np.repeat(np.arange(len(monsters)), table.max_level)
+        levels = np.tile(np.arange(1, table.max_level + 1), len(monsters))
+        complex_stats = table.gather(class_ids, levels, simple_mode=False)
+        simple_stats = table.gather(class_ids, levels, simple_mode=True)
+        for row in range(len(class_ids)):
+            monster_class = monsters[int(class_ids[row])]
+            level = int(levels[row])
+            expected = [MonsterBase.stat_cache.get(monster_class, level, stat) for stat in range(4)]
+            self.assertEqual(list(complex_stats[row]), expected)
+            monster = monster_class(simple_mode=False, level=level)
+            self.assertEqual(expected, [monster.get_attack(), monster.get_defense(), monster.get_speed(), monster.get_max_hp()])
+            monster = monster_class(simple_mode=True, level=level)
+            self.assertEqual(
+                list(simple_stats[row]),
+                [monster.get_attack(), monster.get_defense(), monster.get_speed(), monster.get_max_hp()],
+            )
+
+    @number("ext.8.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_formulas_over_all_levels_match_get_stats(self):
+        monsters = ArrayR.from_list([
+            formula_class("level 3 * 7 /", "level sqrt 2 +", "10 level 40 middle", "100 level - 3 /"),
+            formula_class("level 2 power 1 -", "level 9 50 middle", "0 level - 2 /", "level level * sqrt"),
+            # 2 ** level is past what float64 holds exactly after level 53, so those levels are evaluated one by one
+            formula_class("2 level power", "level", "level 3 /", "1 level +"),
+        ])
+        table = StatTable(monsters, max_level=60)
+        for i in range(len(monsters)):
+            complex = monsters[i].get_complex_stats()
+            for level in range(1, table.max_level + 1):
+                expected = [complex.get_attack(level), complex.get_defense(level), complex.get_speed(level), complex.get_max_hp(level)]
+                self.assertEqual(list(table.complex[i, level - 1]), expected)
+        with self.assertRaises(ArithmeticError):
+            monsters[2].get_complex_stats().stats_at_levels(np.arange(1, 61, dtype=np.float64))
@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from random_gen import RandomGen
+from team import MonsterTeam
+from team_columns import TeamColumns
+
+
+def team_classes(team: MonsterTeam) -> list:
+    """The classes of a BACK team, front to back, leaving the team as it was."""
+    classes = []
+    for _ in range(len(team)):
+        monster = team.retrieve_from_team()
+        classes.append(type(monster))
+        team.add_to_team(monster)
+    return classes
+
+
+class TestTeamColumns(TestCase):
+
+    @number("ext.23.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_generate_draws_like_random_teams(self):
+        RandomGen.set_seed(2024)
+        columns = TeamColumns.generate(50, 2, 10)
+        after_columns = RandomGen.randint(0, 10 ** 6)
+
+        RandomGen.set_seed(2024)
+        for i in range(50):
+            team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
+            lives = RandomGen.randint(2, 10)
+            self.assertEqual(team_classes(columns.materialize(i)), team_classes(team))
+            self.assertEqual(columns.lives[i], lives)
+            mask = 0
+            for monster_class in team_classes(team):
+                mask |= monster_class.get_element_bit()
+            self.assertEqual(columns.element_masks[i], mask)
+        self.assertEqual(RandomGen.randint(0, 10 ** 6), after_columns)
+
+    @number("ext.23.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_materialize_ignores_later_spawnability(self):
+        RandomGen.set_seed(7)
+        columns = TeamColumns.generate(1, 2, 10)
+        monster_class = columns.monster_classes(0)[0]
+        original = monster_class.__dict__["can_be_spawned"]
+        monster_class.can_be_spawned = classmethod(lambda cls: False)
+        try:
+            team = columns.materialize(0)
+        finally:
+            monster_class.can_be_spawned = original
+        self.assertEqual(team_classes(team)[0], monster_class)
+
+    @number("ext.23.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_lives_range(self):
+        columns = TeamColumns.generate(3, 300, 300)
+        self.assertEqual(list(columns.lives), [300, 300, 300])
+        with self.assertRaises(ValueError):
+            TeamColumns.generate(1, 2, TeamColumns.MAX_LIVES + 1)
+        with self.assertRaises(ValueError):
+            TeamColumns.generate(1, 5, 2)
+        # a team without lives would be battled although it is already dead
+        with self.assertRaises(ValueError):
+            TeamColumns.generate(1, 0, 3)
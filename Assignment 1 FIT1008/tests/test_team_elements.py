@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import yaml
+
+from ed_utils.decorators import number, visibility
+
+import helpers
+from elements import Element
+from random_gen import RandomGen
+from team import MonsterTeam
+from data_structures.bset import BSet
+from data_structures.referential_array import ArrayR
+
+
+def scanned_elements(team: MonsterTeam) -> BSet:
+    """The elements of a team found by retrieving every monster, leaving the team as it was."""
+    elements = BSet()
+    monsters = []
+    for _ in range(len(team)):
+        monster = team.retrieve_from_team()
+        monsters.append(monster)
+        elements.add(monster.get_element_type().value)
+    for monster in monsters:
+        team.add_to_team(monster)
+    return elements
+
+
+class TestTeamElements(TestCase):
+
+    @number("ext.25.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_mask_follows_team_changes(self):
+        RandomGen.set_seed(11)
+        modes = [
+            (MonsterTeam.TeamMode.FRONT, None),
+            (MonsterTeam.TeamMode.BACK, None),
+            (MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SortMode.HP),
+        ]
+        for _ in range(30):
+            for team_mode, sort_key in modes:
+                team = MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+                self.assertEqual(team.elements().elems, scanned_elements(team).elems)
+                team.retrieve_from_team()
+                team.special()
+                self.assertEqual(team.elements().elems, scanned_elements(team).elems)
+                team.regenerate_team()
+                self.assertEqual(team.elements().elems, scanned_elements(team).elems)
+                while len(team) > 0:
+                    team.retrieve_from_team()
+                self.assertTrue(team.elements().is_empty())
+
+    @number("ext.25.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_bset_from_bits(self):
+        elements = BSet.from_bits(0b101)
+        self.assertIn(1, elements)
+        self.assertNotIn(2, elements)
+        self.assertIn(3, elements)
+        with self.assertRaises(TypeError):
+            BSet.from_bits(-1)
+
+
+class TestTeamElementsReload(TestCase):
+
+    def setUp(self) -> None:
+        helpers.get_all_monsters()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "monsters.yaml")
+
+    def tearDown(self) -> None:
+        helpers.reload_monsters(helpers.MONSTERS_PATH)
+        shutil.rmtree(self.directory)
+
+    @number("ext.25.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_reload_recounts_elements(self):
+        team = MonsterTeam(
+            MonsterTeam.TeamMode.BACK,
+            MonsterTeam.SelectionMode.PROVIDED,
+            provided_monsters=ArrayR.from_list([helpers.Flamikin, helpers.Flamikin]),
+        )
+        self.assertEqual(team.elements().elems, 1 << (Element.FIRE.value - 1))
+
+        with open(helpers.MONSTERS_PATH) as f:
+            catalog = yaml.safe_load(f)
+        for monster in catalog:
+            if monster["name"] == "Flamikin":
+                monster["element"] = "Water"
+        with open(self.path, "w") as f:
+            yaml.safe_dump(catalog, f)
+        helpers.reload_monsters(self.path)
+
+        # adding and retrieving do not check the catalog version, the counts stay stale until read
+        team.add_to_team(team.retrieve_from_team())
+        self.assertNotEqual(team.elements_version, helpers.get_catalog_version())
+        self.assertEqual(team.elements().elems, 1 << (Element.WATER.value - 1))
+        self.assertEqual(team.elements_version, helpers.get_catalog_version())
+        team.retrieve_from_team()
+        self.assertEqual(team.elements().elems, 1 << (Element.WATER.value - 1))
+        team.retrieve_from_team()
+        self.assertTrue(team.elements().is_empty())
@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from random_gen import RandomGen
+from team import MonsterTeam
+
+
+def sorted_items(items) -> list:
+    """The (monster, key) pairs of a sorted list, front to back."""
+    return [(items[i].value, items[i].key) for i in range(len(items))]
+
+
+class TestTeamRegenerate(TestCase):
+
+    @number("ext.16.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_special_after_regenerate_keeps_original_team(self):
+        for seed in range(20):
+            RandomGen.set_seed(seed)
+            for sort_key in MonsterTeam.SortMode:
+                team = MonsterTeam(MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+                team.regenerate_team()
+                regenerated = sorted_items(team.arr)
+                original = sorted_items(team.original_team)
+
+                team.special()
+                self.assertEqual(sorted_items(team.original_team), original)
+                keys = [key for _, key in original]
+                self.assertEqual(keys, sorted(keys))
+                # restoring a snapshot needs original_team to still be sorted
+                team.restore(team.snapshot())
+
+                team.regenerate_team()
+                self.assertEqual([key for _, key in sorted_items(team.arr)], [key for _, key in regenerated])
+                self.assertCountEqual(
+                    [type(monster).__name__ for monster, _ in sorted_items(team.arr)],
+                    [type(monster).__name__ for monster, _ in regenerated],
+                )
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+
+from elements import Element
+from random_gen import RandomGen
+from team import MonsterTeam
+from tower import BattleTower
+
+
+def scanned_elements(team: MonsterTeam) -> set:
+    """The element values of a team found by retrieving every monster, leaving the team as it was."""
+    elements = set()
+    monsters = []
+    for _ in range(len(team)):
+        monster = team.retrieve_from_team()
+        monsters.append(monster)
+        elements.add(monster.get_element_type().value)
+    for monster in monsters:
+        team.add_to_team(monster)
+    return elements
+
+
+class TestTower(TestCase):
+
+    @number("ext.25.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_out_of_meta_matches_a_scan(self):
+        for seed in range(20):
+            RandomGen.set_seed(seed)
+            tower = BattleTower()
+            tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+            tower.generate_teams(seed % 5 + 1)
+            player = scanned_elements(tower.my_team)
+            seen = set()
+            fought = 0
+            while tower.battles_remaining():
+                alive = tower.alive_enemies
+                index = tower.next_alive[tower.previous_enemy]
+                _, _, enemy, _, _ = tower.next_battle()
+                # the enemy is returned as the battle left it, not regenerated
+                self.assertIs(enemy, tower.battle.team2)
+                if fought == alive:
+                    seen = set()
+                    fought = 0
+                fought += 1
+                seen |= scanned_elements(tower.enemy_columns.materialize(index))
+                if not tower.battles_remaining():
+                    break
+                upcoming = tower.enemy_columns.materialize(tower.next_alive[tower.previous_enemy])
+                expected = [
+                    element for element in Element
+                    if element.value in seen - player - scanned_elements(upcoming)
+                ]
+                out_of_meta = tower.out_of_meta()
+                self.assertEqual([out_of_meta[i] for i in range(len(out_of_meta))], expected)
+
+    @number("ext.24.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_ring_fights_living_teams_in_turn(self):
+        RandomGen.set_seed(99)
+        tower = BattleTower()
+        tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+        # far more living teams than MonsterTeam.TEAM_LIMIT
+        tower.generate_teams(40)
+        tower.player_lives = 10 ** 6
+        expected = list(range(40))
+        for _ in range(300):
+            index = tower.next_alive[tower.previous_enemy]
+            self.assertEqual(index, expected.pop(0))
+            _, _, _, _, lives = tower.next_battle()
+            if lives > 0:
+                expected.append(index)
+            self.assertEqual(tower.alive_enemies, len(expected))
+        self.assertLess(tower.alive_enemies, 40)
+
+    @number("ext.24.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_enemy_teams_lists_living_teams_in_order(self):
+        RandomGen.set_seed(5)
+        tower = BattleTower()
+        tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+        tower.generate_teams(8)
+        for _ in range(5):
+            tower.next_battle()
+        enemy_teams = list(tower.enemy_teams())
+        self.assertEqual(len(enemy_teams), tower.alive_enemies)
+        index = tower.previous_enemy
+        for item in enemy_teams:
+            index = tower.next_alive[index]
+            self.assertEqual(item.key, tower.enemy_columns.lives[index])
+            self.assertEqual(scanned_elements(item.value), scanned_elements(tower.enemy_columns.materialize(index)))
+        # the teams are made one at a time, as they are reached
+        teams = tower.enemy_teams()
+        first = next(teams)
+        self.assertEqual(first.key, tower.enemy_columns.lives[tower.next_alive[tower.previous_enemy]])
@@ -1,6 +1,9 @@
 from __future__ import annotations
+from array import array
+from typing import Iterator
 from random_gen import RandomGen
 from team import MonsterTeam
+from team_columns import TeamColumns
 from battle import Battle
 from data_structures.bset import BSet
 from data_structures.queue_adt import CircularQueue
@@ -15,6 +18,8 @@ class BattleTower:
 
     MIN_LIVES = 2
     MAX_LIVES = 10
+    # holds the index of the next living enemy team of every team
+    NEXT_ALIVE_TYPECODE = "L"
     
     def __init__(self, battle: Battle | None = None) -> None:
         """
@@ -25,6 +30,8 @@ class BattleTower:
         self.player_lives = 0
         self.current_enemy = 0
         self.tower_elements = BSet()
+        self.alive_enemies = 0
+        self.previous_enemy = -1
     
     def place_element(self, queue, team, elements_bset) -> None:
         """
@@ -76,61 +83,50 @@ class BattleTower:
         Generate n enemy teams.
         p is the number of enemy teams to generate
         n is the size of the team but it can be increased thus it is not constant
-        m is the total amount of monster which also can be increased thus it is not a constant
-        k is the complexity of get_all_monsters()
-
-        Best case:  O(p + (k + n * m)) where n is the number of enemy teams to generate
-        p is from the instantiation of CircularQueue where the the number of enemy teams can be any number
-        Worst case: O(p * (k + n * m)) where n is the number of enemy teams to generate
-        Other than p, the rest of the complexity is from 
-        Those are all from MonsterTeam.SelectionMode.Random where it is O(k + n * m) accounting the worst case scenario
-        """
-        # Create a queue to store the enemy teams
-        self.enemy_teams = CircularQueue(n)
-        for _ in range(n):
-            # Generate a random enemy team which TeamMode.Back
-            enemy_team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
-            enemy_lives = RandomGen.randint(self.MIN_LIVES, self.MAX_LIVES)
-            # Use the queue to store the enemy team and the enemy lives using List Item
-            list_item = ListItem(enemy_team, enemy_lives)
-            self.enemy_teams.append(list_item)
-        
+
+        The teams are kept as TeamColumns (team sizes, monster class ids and lives in flat arrays)
+        and only become MonsterTeam objects when they are battled, so very tall towers fit in memory.
+
+        The living teams form a circular linked list over their indices in self.enemy_columns:
+        self.next_alive[i] is the living team fought after team i, and the next team to fight is
+        self.next_alive[self.previous_enemy]. A team is unlinked when it dies, so the order of the
+        other teams is kept and finding the next living team is O(1).
+
+        Best = Worst = O(p * n), every monster pick is O(1)
+        """
+        self.enemy_columns = TeamColumns.generate(n, self.MIN_LIVES, self.MAX_LIVES, MonsterTeam.TeamMode.BACK)
+        self.next_alive = array(self.NEXT_ALIVE_TYPECODE, range(1, n + 1))
+        if n > 0:
+            self.next_alive[n - 1] = 0
+        self.previous_enemy = n - 1
+        self.alive_enemies = n
+
 
         
+    def enemy_teams(self) -> Iterator[ListItem]:
+        """
+        Iterate over the living enemy teams, in the order they will be fought, as ListItems of
+        (team, lives) like generate_teams used to keep them.
+        Every team is materialized from self.enemy_columns when it is reached, so only the team
+        being looked at exists unless the caller keeps them, and changing it does not change the tower.
+        Do not call next_battle before the iteration is over.
+        n is the size of a team: each team costs O(n) time and allocations,
+        going through all p living teams is O(p * n)
+        """
+        index = self.previous_enemy
+        for _ in range(self.alive_enemies):
+            index = self.next_alive[index]
+            yield ListItem(self.enemy_columns.materialize(index), self.enemy_columns.lives[index])
+
     def battles_remaining(self) -> bool:
         """
         Check if there are any battles remaining or if there is any more enemy teams remaining in the tower
-        n is the size of enemy teams but it can be increased thus it is not constant
-        p is the number of enemy teams to generate
+        The number of living enemy teams is kept up to date by next_battle.
 
-        Best case: O(1) where the player lives == 0 and False is return immediately
-        Worst case: O(n + p) where n is from the instantiation of CircularQueue
-        p is from the loop of self.enemy_teams
-        """
-        # Check if player still has lives
-        if self.player_lives == 0:
-            return False
-        else:
-            # Check if there are any enemy teams left
-            all_dead = len(self.enemy_teams)
-            death_total = 0
-            # Create a queue to temporarily store the enemy teams
-            queue = CircularQueue(MonsterTeam.TEAM_LIMIT)
-            for _ in range(len(self.enemy_teams)):
-                # Check if the enemy team still has lives
-                list_item = self.enemy_teams.serve()
-                if list_item.key <= 0:
-                    # if the enemy team has no lives, add 1 to death_total
-                    death_total +=1
-                else:
-                    queue.append(list_item)
-
-            for _ in range(len(queue)):
-                list_item = queue.serve()
-                self.enemy_teams.append(list_item)
-
-            # Check if all enemy teams have no lives
-            return death_total != all_dead
+        Best = Worst = O(1)
+        """
+        # Check if player still has lives and if there are any enemy teams left
+        return self.player_lives != 0 and self.alive_enemies > 0
     
     def next_battle(self) -> tuple[Battle.Result, MonsterTeam, MonsterTeam, int, int]: 
         """
@@ -142,29 +138,42 @@ class BattleTower:
         Best = Worst = O(k * (e^2 + n)) where k is the number of turns the battle lasts for
         This is because the initial big O which is O(k * (e^2 + n) + n + n + n + e * n ) is shortened to O(k * (e^2 + n))
         where the other terms are not as significant and thus can be ignored as they also share the same n value
+        The enemy team is materialized from self.enemy_columns in O(n) for every battle, so it is
+        not regenerated afterwards: the next battle against the same index starts from a fresh team anyway.
+        The enemy team returned is the one which fought, as the battle left it; materialize its index
+        from self.enemy_columns for the team as it will be fought next.
+        Finding the next living enemy team, its elements and dropping it from the tower if it dies is O(1).
         """
         if self.battles_remaining():
-            list_item = self.enemy_teams.serve()
+            index = self.next_alive[self.previous_enemy]
+            # the enemy teams still alive before this battle
+            fought = self.alive_enemies
+            enemy_team = self.enemy_columns.materialize(index)
+            lives = self.enemy_columns.lives
             # Set both teams to battle
-            battle_result = self.battle.battle(self.my_team, list_item.value)
+            battle_result = self.battle.battle(self.my_team, enemy_team)
             
-            # Regenerate the teams
+            # Regenerate the player's team, the enemy team is materialized afresh for its next battle
             self.my_team.regenerate_team()
-            list_item.value.regenerate_team()
 
             # Check the battle result and subtract the lives of teams accordingly
             if battle_result == Battle.Result.TEAM1:
-                list_item.key -= 1
+                lives[index] -= 1
             elif battle_result == Battle.Result.TEAM2:
                 self.player_lives -= 1
             elif battle_result == Battle.Result.DRAW:
                 self.player_lives -=1
-                list_item.key -=1
+                lives[index] -=1
 
-            self.enemy_teams.append(list_item)
+            if lives[index] <= 0:
+                # unlink the dead team, the next team to fight is the one after it
+                self.next_alive[self.previous_enemy] = self.next_alive[index]
+                self.alive_enemies -= 1
+            else:
+                self.previous_enemy = index
 
             # Check if all the enemies have already been fought and reset the current enemy to 0
-            if self.current_enemy == len(self.enemy_teams):
+            if self.current_enemy == fought:
                 # All enemy teams have been fought, then clear the tower elements
                 self.tower_elements = BSet()
                 self.current_enemy = 0
@@ -172,32 +181,25 @@ class BattleTower:
             # current enemy is the index of the enemy team that is currently being fought
             self.current_enemy += 1
 
-            # Place the elements of the enemy team into self.enemy_elements
-            self.enemy_elements = BSet()
-            next_queue = CircularQueue(len(list_item.value))
-            self.place_element(next_queue, list_item.value, self.enemy_elements)
+            # The elements of the enemy team, from its element mask in the columns
+            self.enemy_elements = BSet.from_bits(self.enemy_columns.element_mask(index))
             # Add the elements of the enemy team to the tower elements
             self.tower_elements = self.tower_elements.union(self.enemy_elements)
 
-            return (battle_result, self.my_team, list_item.value, self.player_lives, list_item.key)
+            return (battle_result, self.my_team, enemy_team, self.player_lives, lives[index])
     
     def out_of_meta(self) -> ArrayR[Element]:
         """
         Return the elements that are out of meta which basically means they are in the tower
         but are not in the player's team or the next enemy team
         e is the elements in the list of elements
-        n is the size or number of monsters in the team
 
-        Best case: O(n) when there are no elements in the tower due to no battle has been fought where n is from the instantiation of queue
-        with the size of the enemy team with MonsterTeam.TEAM_LIMIT
-        Worst case: O(n + e) where e is the number of elements in the list of elements and the element in out of meta loop through all the elements
-        to find the element of monster in the tower
+        The sets are element bitmasks: the player's from set_my_team, the next enemy team's from
+        self.enemy_columns (it has not been materialized), so no team is traversed.
+        Best = Worst = O(e) where the elements are counted and looped through once to build the result
         """
-        # Check the element of the next enemy team and add it to the next_elements
-        list_item = self.enemy_teams.peek()
-        self.next_elements = BSet()
-        next_queue = CircularQueue(len(list_item.value))
-        self.place_element(next_queue, list_item.value, self.next_elements)
+        # The elements of the next enemy team
+        self.next_elements = BSet.from_bits(self.enemy_columns.element_mask(self.next_alive[self.previous_enemy]))
 
         # Check the elements which are in meta by getting the union of the original elements and the next elements
         in_meta = self.original_elements.union(self.next_elements)